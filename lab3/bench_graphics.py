@@ -0,0 +1,104 @@
+import os
+import time
+
+import graphics
+from graphics import GraphWin, Circle, Point
+from graphicsmain import InputDialog
+
+""" Benchmarks for drawing with graphics.py. They use the null backend unless GRAPHICS_BACKEND
+says otherwise, so they run without a display and measure the cost of the library itself.
+
+Run with: python bench_graphics.py """
+
+if "GRAPHICS_BACKEND" not in os.environ:
+    graphics.setBackend("null")  # measure the library, not Tk
+
+_win = None
+
+def _window():
+    global _win
+    if _win is None:
+        _win = GraphWin("benchmark", 640, 480, autoflush=False)
+        _win.setCoords(-110, -10, 110, 155)
+    return _win
+
+""" Draw n circles and undraw them again, oldest first """
+def drawUndraw(n):
+    win = _window()
+    circles = [Circle(Point(i % 200 - 100, i % 150), 3) for i in range(n)]
+    for c in circles:
+        c.draw(win)
+    for c in circles:
+        c.undraw()
+
+def time_draw_undraw_10k():
+    drawUndraw(10000)
+
+_moving = None
+
+""" Move 1000 drawn circles back and forth, two animation frames """
+def time_move_1k():
+    global _moving
+    win = _window()
+    if _moving is None:
+        _moving = [Circle(Point(i % 200 - 100, i % 150), 3).draw(win) for i in range(1000)]
+    for dx in (0.5, -0.5):
+        win.beginFrame()
+        for c in _moving:
+            c.move(dx, 0)
+        win.endFrame()
+
+""" Frame pacing: how irregularly (standard deviation, in seconds) 100 frames at 50 fps start, while each frame moves 100 circles """
+def track_frame_jitter():
+    win = _window()
+    circles = [Circle(Point(i % 200 - 100, i % 150), 3).draw(win) for i in range(100)]
+    win.pacer.resetStats()
+    for i in range(100):
+        win.beginFrame()
+        for c in circles:
+            c.move(0.1, 0)
+        win.endFrame()
+        win.paceFrame(50)
+    for c in circles:
+        c.undraw()
+    return win.pacer.stats()["jitter"]
+
+""" The input dialog work of one turn: a new dialog per turn, as GameGraphics.play used to do """
+def time_turn_new_dialog():
+    dialog = InputDialog(45, 40, 1.5)
+    dialog.getValues()
+    dialog.close()
+
+_dialog = None
+
+""" The input dialog work of one turn: refreshing a dialog that stays open """
+def time_turn_reused_dialog():
+    global _dialog
+    if _dialog is None:
+        _dialog = InputDialog(45, 40, 1.5)
+    _dialog.setValues(45, 40, 1.5)
+    _dialog.getValues()
+
+
+if __name__ == "__main__":
+    print("backend: " + graphics.getBackend())
+    win = _window()
+    for n in [1000, 10000, 40000]:
+        circles = [Circle(Point(i % 200 - 100, i % 150), 3) for i in range(n)]
+        start = time.perf_counter()
+        for c in circles:
+            c.draw(win)
+        drawn = time.perf_counter()
+        for c in circles:
+            c.undraw()
+        undrawn = time.perf_counter()
+        print("{0:>6} objects: draw {1:5.2f} us, undraw {2:5.2f} us per object".format(
+            n, (drawn - start) / n * 1e6, (undrawn - drawn) / n * 1e6))
+
+    for name, bench in [("new dialog per turn", time_turn_new_dialog),
+                        ("reused dialog", time_turn_reused_dialog)]:
+        turns = 200
+        start = time.perf_counter()
+        for i in range(turns):
+            bench()
+        print("{0:<20} {1:8.1f} us per turn".format(name, (time.perf_counter() - start) / turns * 1e6))
@@ -0,0 +1,49 @@
+import gamemodel
+from gamemodel import Game, Projectile
+
+""" Benchmarks for the game model, without any drawing.
+
+Run with: python benchmark.py -k bench_model """
+
+_game = Game(10, 3, 0)
+
+""" 1000 plain update steps of a single projectile """
+def time_projectile_update_1k():
+    proj = Projectile(45, 40, 0, -90, 5, -110, 110)
+    for i in range(1000):
+        proj.update(1/50)
+
+""" A whole shot as the drivers play it: fire, step until it stops, check the distance to the opponent """
+def time_full_shot():
+    _game.setCurrentWind(1.5)
+    proj = _game.getCurrentPlayer().fire(45, 40)
+    while proj.isMoving():
+        proj.update(1/50)
+    _game.getOtherPlayer().projectileDistance(proj)
+
+""" The same shot, resolved in closed form """
+def time_resolved_shot():
+    _game.setCurrentWind(1.5)
+    proj = _game.getCurrentPlayer().fire(45, 40)
+    proj.resolve(1/50)
+    _game.getOtherPlayer().projectileDistance(proj)
+
+def time_new_round():
+    _game.newRound()
+
+""" 1000 steps of a batch of 1000 projectiles. Needs numpy """
+def time_batch_update_1k_projectiles():
+    np = gamemodel._numpy()
+    batch = gamemodel.ProjectileBatch(np.linspace(10, 80, 1000), 40, 0, -90, 5, -110, 110)
+    for i in range(1000):
+        batch.update(1/50)
+
+_salvo = None
+
+""" One Game.step with 500 projectiles in flight. They are relaunched when they have landed """
+def time_step_500_in_flight():
+    global _salvo
+    if _salvo is None or len(_salvo.getFlying()) < 500:
+        _salvo = Game(10, 3, 0)
+        _salvo.salvo([i % 80 + 5 for i in range(500)], 150)
+    _salvo.step(1/1000)
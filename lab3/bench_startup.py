@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+""" Startup benchmarks for the graphics module. Every measurement runs in a fresh interpreter,
+so nothing is cached from earlier imports. importing graphics no longer creates the Tk root,
+that cost (track_tk_root) is now paid by the first GraphWin instead.
+
+Run with: python bench_startup.py """
+
+REPEAT = 5
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+""" Run setup and then stmt in a fresh interpreter, returning the time stmt took in seconds (best of REPEAT) """
+def timeFresh(stmt, setup=""):
+    code = "\n".join([setup, "import time", "_start = time.perf_counter()", stmt,
+                      "print(time.perf_counter() - _start)"])
+    times = []
+    for i in range(REPEAT):
+        out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.split()[-1]))
+    return min(times)
+
+def track_import_graphics():
+    return timeFresh("import graphics")
+
+def track_import_graphicsmain():
+    return timeFresh("import graphicsmain")
+
+""" A tool that only uses the geometry classes and never opens a window """
+def track_geometry_only():
+    return timeFresh("import graphics\n"
+                     "t = graphics.Transform(640, 480, -110, -10, 110, 155)\n"
+                     "t.screen(graphics.Point(1, 2).getX(), 2)\n"
+                     "graphics.color_rgb(1, 2, 3)")
+
+""" Creating the Tk root, which every import used to pay for. Needs a display for the tk backend """
+def track_tk_root():
+    return timeFresh("graphics._getRoot()", setup="import graphics")
+
+
+if __name__ == "__main__":
+    for name, bench in [("import graphics", track_import_graphics),
+                        ("import graphicsmain", track_import_graphicsmain),
+                        ("geometry only", track_geometry_only),
+                        ("Tk root (first window)", track_tk_root)]:
+        try:
+            print("{0:<24}{1:10.2f} ms".format(name, bench() * 1000))
+        except subprocess.CalledProcessError:
+            print("{0:<24}{1:>13}".format(name, "failed"))
@@ -0,0 +1,122 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+import platform
+import sys
+import timeit
+
+""" Runs the benchmark suite: every time_* and track_* function in the bench_*.py modules next
+to this file, in the style of asv.
+A time_* function is called repeatedly and its best time per call (in seconds) is recorded.
+A track_* function is called once and returns the value to record, such as a time it measured
+itself in a fresh interpreter.
+
+Results can be saved as a JSON baseline and later runs compared with it, to catch regressions:
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json
+
+No baseline is kept in the repository: timings are only comparable on the machine (and Python)
+that made them. Save a baseline before a change and compare with it after. The machine details
+are stored with the results, and a comparison warns when they differ. """
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPEAT = 5
+""" A benchmark more than this factor slower than the baseline is reported as a regression """
+THRESHOLD = 1.2
+
+
+""" The benchmarks as (name, function) pairs, where name is module.function. Only names containing one of filters are kept """
+def discover(filters=()):
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    benchmarks = []
+    for path in sorted(glob.glob(os.path.join(HERE, "bench_*.py"))):
+        module = importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+        for attr in sorted(vars(module)):
+            name = module.__name__ + "." + attr
+            if attr.startswith(("time_", "track_")) and callable(getattr(module, attr)) and \
+               (not filters or any(f in name for f in filters)):
+                benchmarks.append((name, getattr(module, attr)))
+    return benchmarks
+
+""" Run one benchmark, returns its value or None if it failed """
+def measure(name, bench):
+    try:
+        if name.split(".")[-1].startswith("track_"):
+            return float(bench())
+        timer = timeit.Timer(bench)
+        number, total = timer.autorange()
+        return min([total] + timer.repeat(REPEAT - 1, number)) / number
+    except Exception as e:
+        print("{0}: failed ({1}: {2})".format(name, type(e).__name__, e), file=sys.stderr)
+        return None
+
+""" Run the benchmarks, printing each result. Returns a dict from name to value """
+def runAll(benchmarks, baseline=None):
+    results = {}
+    for name, bench in benchmarks:
+        value = measure(name, bench)
+        results[name] = value
+        print(formatResult(name, value, (baseline or {}).get(name)))
+    return results
+
+def formatResult(name, value, old=None):
+    if value is None:
+        return "{0:<50}{1:>12}".format(name, "failed")
+    line = "{0:<50}{1:>12}".format(name, formatValue(value))
+    if old:
+        ratio = value / old
+        line += "  {0:>10} {1:5.2f}x{2}".format(formatValue(old), ratio, "  REGRESSION" if ratio > THRESHOLD else "")
+    return line
+
+def formatValue(value):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if value * scale >= 1:
+            return "{0:.3g} {1}".format(value * scale, unit)
+    return "{0:.3g} ns".format(value * 1e9)
+
+""" The machine and Python a baseline was taken on """
+def machine():
+    return {"python": sys.version, "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count()}
+
+""" The benchmarks that are more than threshold times slower than in baseline, as (name, ratio) pairs """
+def regressions(results, baseline, threshold=THRESHOLD):
+    return [(name, value / baseline[name]) for name, value in results.items()
+            if value is not None and baseline.get(name) and value / baseline[name] > threshold]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("-k", dest="filters", action="append", default=[],
+                        help="only run benchmarks whose name contains this text (can be repeated)")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare with a saved baseline, exit with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="slowdown factor counted as a regression (default %(default)s)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline = saved["results"]
+        if saved.get("machine") != machine():
+            print("warning: {} was taken on another machine or Python, timings may not be comparable".format(args.compare),
+                  file=sys.stderr)
+    THRESHOLD = args.threshold
+
+    results = runAll(discover(args.filters), baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"machine": machine(), "results": results}, f, indent=1, sort_keys=True)
+    if baseline is not None:
+        slower = regressions(results, baseline, args.threshold)
+        for name, ratio in slower:
+            print("regression: {0} is {1:.2f}x slower".format(name, ratio))
+        sys.exit(1 if slower else 0)
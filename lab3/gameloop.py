@@ -0,0 +1,89 @@
+import time
+
+import graphics
+
+""" A game loop with a fixed physics time step, decoupled from the rendering rate.
+Real time is collected in an accumulator and the simulation is advanced in steps of exactly
+dt seconds, so the physics is the same whatever the display rate. When a frame is slow,
+several steps are taken before the next render (frames are skipped) and the animation
+stays in real time. """
+
+class FixedStepLoop:
+    """
+        step(dt) advances the simulation by exactly dt seconds.
+        render(alpha) draws the simulation, alpha (0 to 1) is how far real time has moved from
+        the previous step towards the current one, to be used for interpolation.
+        rate is the frame rate passed to update (graphics.update by default).
+        At most maxSteps steps are taken per frame. If the loop falls further behind than that
+        the remaining time is dropped, slowing down the animation instead of stalling it.
+        clock is the real time in seconds, time.perf_counter unless a test wants to control it.
+    """
+    def __init__(self, step, render, dt=1/50, rate=50, maxSteps=5, update=graphics.update, clock=time.perf_counter):
+        self.step = step
+        self.render = render
+        self.dt = dt
+        self.rate = rate
+        self.maxSteps = maxSteps
+        self.update = update
+        self.clock = clock
+        self._start()
+
+    """ Run the loop until done() returns true. The last state is always rendered """
+    def run(self, done):
+        self._start()
+        while not done():
+            self._frame(done)
+            self.update(self.rate)
+        self.render(1.0)
+
+    """ Like run, but waits for the next frame with update (graphics.updateAsync by default),
+    so other asyncio tasks can run while the animation plays """
+    async def runAsync(self, done, update=graphics.updateAsync):
+        self._start()
+        while not done():
+            self._frame(done)
+            await update(self.rate)
+        self.render(1.0)
+
+    def _start(self):
+        self.frameTimes = []
+        self.steps = 0
+        self.skippedFrames = 0
+        self.droppedTime = 0.0
+        self.accumulator = 0.0
+        self.previous = self.clock()
+
+    def _frame(self, done):
+        # Step the physics to catch up with real time, then render once
+        now = self.clock()
+        frameTime = now - self.previous
+        self.previous = now
+        self.frameTimes.append(frameTime)
+        self.accumulator = self.accumulator + frameTime
+
+        steps = 0
+        while self.accumulator >= self.dt and steps < self.maxSteps and not done():
+            self.step(self.dt)
+            self.accumulator = self.accumulator - self.dt
+            steps = steps + 1
+        if steps > 1:
+            self.skippedFrames = self.skippedFrames + steps - 1
+        if steps == self.maxSteps and self.accumulator >= self.dt:
+            self.droppedTime = self.droppedTime + self.accumulator
+            self.accumulator = 0.0
+        self.steps = self.steps + steps
+
+        self.render(min(self.accumulator / self.dt, 1.0))
+
+    """ Frame statistics of the last run: frame count, physics steps, skipped frames,
+    dropped time and mean/max frame time in seconds """
+    def stats(self):
+        times = self.frameTimes or [0.0]
+        return {"frames": len(self.frameTimes), "steps": self.steps,
+                "skipped": self.skippedFrames, "dropped": self.droppedTime,
+                "mean": sum(times) / len(times), "max": max(times)}
+
+    def report(self):
+        stats = self.stats()
+        return ("{frames} frames, {steps} steps, {skipped} skipped frames, {dropped:.3f} s dropped, "
+                "frame time mean {0:.1f} ms max {1:.1f} ms").format(stats["mean"] * 1000, stats["max"] * 1000, **stats)
@@ -1,11 +1,32 @@
-from math import sin,cos,radians
+from math import sin,cos,radians,sqrt,ceil
+from array import array
+from collections import deque
+from itertools import islice
+import hashlib
+import numbers
 import random
+import sys
+
+np = None  # numpy is optional and only needed for ProjectileBatch, it is imported by _numpy
+
+
+""" Settings for the aiming solver in Player: the angles tried, the highest velocity considered,
+the wind resolution of the solution cache, the time step used to check solutions and how far
+(in x) a cached solution may land from where it landed in the cached wind before it is solved again """
+AIM_ANGLES = range(10, 90, 5)
+AIM_MAX_VELOCITY = 150
+AIM_WIND_STEP = 0.1
+AIM_TIME_STEP = 1/50
+AIM_TOLERANCE = 0.5
 
 
 """ This is the model of the game"""
 class Game:
-    """ Create a game with a given size of cannon (length of sides) and projectiles (radius) """
-    def __init__(self, cannonSize, ballSize):
+    """
+        Create a game with a given size of cannon (length of sides) and projectiles (radius).
+        rng decides the wind of every round, see WindSchedule. By default the random module is used.
+    """
+    def __init__(self, cannonSize, ballSize, rng=None):
         
         self.cannonSize=cannonSize
         self.ballSize=ballSize
@@ -13,7 +34,8 @@ class Game:
         self.players=[Player(self,False,-90,"blue"), Player(self,True,90,"red")]
    
         self.currentPlayerIndex = 0 
-        self.wind = 20*random.random()-10
+        self.winds = rng if isinstance(rng, WindSchedule) else WindSchedule(rng)
+        self.winds.next()
         
 
     """ A list containing both players """
@@ -52,18 +74,142 @@ class Game:
 
     """ Set the current wind speed, only used for testing """
     def setCurrentWind(self, wind):
-        self.wind = wind
+        self.winds.current = wind
     
     def getCurrentWind(self):
-        return self.wind 
+        return self.winds.current 
     
 
     """ Start a new round with a random wind value (-10 to +10) """
     def newRound(self):
-        wind = 20*random.random()-10
-        self.setCurrentWind(wind)
+        wind = self.winds.next()
         
         return wind
+
+    """ Draw the wind of the next n rounds at once, returns them as a list. newRound uses them in order """
+    def predrawWinds(self, n):
+        return self.winds.predraw(n)
+
+    """ 
+        Fire a projectile for a player (the current player if not given) and add it to the
+        projectiles in flight, see step. The aim of the player is updated like with Player.fire.
+        Returns the id of the projectile.
+    """
+    def launch(self, angle, velocity, playerNr=None):
+        if playerNr is None:
+            playerNr = self.currentPlayerIndex
+        return self.getFlying().add(playerNr, [self.players[playerNr].fire(angle, velocity)])[0]
+
+    """ 
+        Fire many projectiles at once for a player (the current player if not given), one for each
+        angle and velocity. Either may be a single value used for every shot, if both are sequences
+        they must have the same length. The aim is not changed. Returns the ids of the projectiles.
+    """
+    def salvo(self, angles, velocities, playerNr=None):
+        if playerNr is None:
+            playerNr = self.currentPlayerIndex
+        if _count(angles) != _count(velocities) and hasattr(angles, "__len__") and hasattr(velocities, "__len__"):
+            raise ValueError("salvo got {} angles but {} velocities".format(len(angles), len(velocities)))
+        count = max(_count(angles), _count(velocities))
+        angles, velocities = _repeat(angles, count), _repeat(velocities, count)
+        player = self.players[playerNr]
+        return self.getFlying().add(playerNr, [player._projectile(angle, velocity, self.getCurrentWind())
+                                               for angle, velocity in zip(angles, velocities)])
+
+    """ Both players fire at the same time, each with an (angle, velocity) pair. Returns the ids of the two projectiles """
+    def fireBoth(self, aim0, aim1):
+        return [self.launch(aim0[0], aim0[1], 0), self.launch(aim1[0], aim1[1], 1)]
+
+    """ 
+        Advance every projectile in flight by time seconds. Returns the projectiles that stopped
+        in this step as a list of (id, player number, Projectile), they are no longer in flight.
+        Scoring is left to the caller.
+    """
+    def step(self, time):
+        return self.getFlying().step(time)
+
+    """ 
+        The projectiles in flight, an ActiveProjectiles. It is created when first needed, so games
+        that fire one shot at a time don't carry it. batched is passed on when it is created
+    """
+    def getFlying(self, batched=None):
+        if not hasattr(self, "flying"):
+            self.flying = ActiveProjectiles(batched)
+        return self.flying
+
+
+"""
+    The sequence of wind values of a game, drawn uniformly from -10 to +10. rng can be:
+    None for the random module, an integer seed (numpy integers too), a random.Random, a
+    numpy.random.Generator, or any iterable of wind values (a fixed schedule, which may run out).
+    The same rng always gives the same winds, whether they are drawn one by one or predrawn.
+    current is the wind of the current round, the value last returned by next.
+"""
+class WindSchedule:
+    def __init__(self, rng=None):
+        if rng is None:
+            rng = random
+        elif isinstance(rng, numbers.Integral):
+            rng = random.Random(int(rng))
+
+        self.queue = deque()
+        self.current = None
+        if rng is random or isinstance(rng, random.Random):
+            self.draw = lambda n: [20*rng.random()-10 for i in range(n)]
+        elif _isGenerator(rng):
+            self.draw = lambda n: (20*rng.random(n)-10).tolist()
+        else:
+            schedule = iter(rng)
+            self.draw = lambda n: [float(wind) for wind in islice(schedule, n)]
+
+    """ Move on to the next wind value and return it """
+    def next(self):
+        if not self.queue:
+            self.predraw(1)
+        self.current = self.queue.popleft()
+        return self.current
+
+    """ Draw n more wind values in one go and queue them. Returns the values drawn """
+    def predraw(self, n):
+        winds = self.draw(n)
+        if len(winds) < n:
+            raise ValueError("the wind schedule has run out")
+        self.queue.extend(winds)
+        return winds
+
+
+def _isGenerator(rng):
+    # A numpy Generator can only exist if the program has imported numpy
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(rng, numpy.random.Generator)
+
+""" numpy, imported when it is first needed so that importing this module stays cheap. None if it is not installed """
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+def _count(values):
+    return len(values) if hasattr(values, "__len__") else 1
+
+def _repeat(values, count):
+    return list(values) if hasattr(values, "__len__") else [values]*count
+
+
+"""
+    A 64-bit seed for one shard of a simulation campaign, derived from the campaign seed and any
+    number of keys (shard number, game number, ...) by hashing. Different keys give unrelated seeds,
+    so every shard gets its own reproducible random stream whatever process it runs in.
+"""
+def shardSeed(seed, *keys):
+    text = ":".join(str(key) for key in (seed,) + keys)
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
     
 
 """ Models a player """
@@ -85,19 +231,100 @@ class Player:
         self.angle=angle
         self.velocity=velocity
 
+        return self._projectile(angle, velocity, self.game.getCurrentWind())
+
+    """ A projectile fired from this players cannon with the given wind, without changing the aim """
+    def _projectile(self, angle, velocity, wind):
         if self.isReversed:
             start_angle=180-angle
             
         else:
-            start_angle=self.angle     
+            start_angle=angle     
 
         starting_x=self.start_x_value 
         starting_y = self.game.getCannonSize() / 2 
     
-        proj=Projectile(start_angle, velocity, self.game.getCurrentWind(), starting_x, starting_y, -110, 110)
-    
-        
-        return proj 
+        return Projectile(start_angle, velocity, wind, starting_x, starting_y, -110, 110)
+
+    """ 
+        The (angle, velocity) pairs that hit the opponent with the given wind (the current wind if not given).
+        Each pair is checked with the same time step as the game drivers, so projectileDistance is 0 for all of them.
+    """
+    def solveAim(self, wind=None):
+        if wind is None:
+            wind = self.game.getCurrentWind()
+        opponent = [p for p in self.game.getPlayers() if p is not self][0]
+        return [(angle, velocity) for angle, velocity, proj in self._aims(opponent.getX(), wind)
+                if opponent.projectileDistance(proj) == 0]
+
+    """ The (angle, velocity) with the current wind that lands closest to target_x, or None if no aim reaches it """
+    def aimAt(self, target_x):
+        aims = self._aims(target_x, self.game.getCurrentWind())
+        if not aims:
+            return None
+        angle, velocity, proj = min(aims, key=lambda aim: abs(aim[2].getX() - target_x))
+        return angle, velocity
+
+    # Solutions depend only on the launch position, the target and the wind, so they are shared by all players
+    _aimCache = {}
+
+    # The cache holds the solutions for the wind rounded to AIM_WIND_STEP. They are candidates for the
+    # actual wind: each is resolved again with that wind, and solved again if it lands too far off
+    def _aims(self, target_x, wind):
+        gridWind = round(wind / AIM_WIND_STEP) * AIM_WIND_STEP
+        key = (self.isReversed, self.start_x_value, self.game.getCannonSize(), target_x, gridWind)
+        if key not in Player._aimCache:
+            Player._aimCache[key] = self._solveAims(target_x, gridWind)
+        if wind == gridWind:
+            return Player._aimCache[key]
+
+        aims = []
+        for angle, velocity, candidate in Player._aimCache[key]:
+            proj = self._projectile(angle, velocity, wind)
+            proj.resolve(AIM_TIME_STEP)
+            if abs(proj.getX() - candidate.getX()) > AIM_TOLERANCE:
+                velocity = self._solveVelocity(angle, wind, target_x)
+                if velocity is None:
+                    continue
+                proj = self._projectile(angle, velocity, wind)
+                proj.resolve(AIM_TIME_STEP)
+            aims.append((angle, velocity, proj))
+        return aims
+
+    def _solveAims(self, target_x, wind):
+        aims = []
+        for angle in AIM_ANGLES:
+            velocity = self._solveVelocity(angle, wind, target_x)
+            if velocity is not None:
+                proj = self._projectile(angle, velocity, wind)
+                proj.resolve(AIM_TIME_STEP)
+                aims.append((angle, velocity, proj))
+        return aims
+
+    """ Find the velocity that makes a shot at angle land at target_x, by bisection on the closed-form impact position """
+    def _solveVelocity(self, angle, wind, target_x):
+        def miss(velocity):
+            return self._projectile(angle, velocity, wind).impactX() - target_x
+
+        # Scan for the first sign change, the impact is not monotonic in the velocity against strong wind
+        low, lowMiss = 0.0, miss(0.0)
+        for high in range(5, AIM_MAX_VELOCITY+1, 5):
+            highMiss = miss(high)
+            if (lowMiss < 0) != (highMiss < 0):
+                break
+            low, lowMiss = high, highMiss
+        else:
+            return None
+
+        high = float(high)
+        for i in range(50):
+            mid = (low + high) / 2
+            midMiss = miss(mid)
+            if (lowMiss < 0) == (midMiss < 0):
+                low, lowMiss = mid, midMiss
+            else:
+                high = mid
+        return (low + high) / 2
 
     """ Gives the x-distance from this players cannon to a projectile. If the cannon and the projectile touch (assuming the projectile 
     is on the ground and factoring in both cannon and projectile size) this method should return 0"""
@@ -169,6 +396,7 @@ class Projectile:
         self.xvel = velocity*cos(theta)
         self.yvel = velocity*sin(theta)
         self.wind = wind
+        self.trace = None
 
 
     """ 
@@ -190,14 +418,350 @@ class Projectile:
         
         self.yvel = yvel1
         self.xvel = xvel1
+
+        if self.trace is not None:
+            self.trace.record(time, self.xPos, self.yPos)
         
     """ A projectile is moving as long as it has not hit the ground or moved outside the xLower and xUpper limits """
     def isMoving(self):
         return 0 < self.getY() and self.xLower < self.getX() < self.xUpper
 
+    # Closed-form solver. The acceleration is constant (gravity and wind), so the position
+    # after t seconds is a quadratic in t and the stepped update above is exact at every tick.
+    # All times are measured from the current state of the projectile.
+
+    """ The (unclamped) position t seconds from now """
+    def positionAt(self, t):
+        x = self.xPos + self.xvel*t + self.wind*t*t / 2.0
+        y = self.yPos + self.yvel*t - 9.8*t*t / 2.0
+        return x, y
+
+    """ Time until the projectile reaches the ground (y = 0) """
+    def landingTime(self):
+        return (self.yvel + sqrt(self.yvel*self.yvel + 2*9.8*self.yPos)) / 9.8
+
+    """ Time until the projectile reaches xLower or xUpper, or None if it never does """
+    def wallTime(self):
+        times = [t for bound in (self.xLower, self.xUpper)
+                   for t in _positiveRoots(self.wind / 2.0, self.xvel, self.xPos - bound)]
+        if times:
+            return min(times)
+        return None
+
+    """ Time until the projectile stops, i.e. hits the ground or a wall """
+    def stopTime(self):
+        landing = self.landingTime()
+        wall = self.wallTime()
+        if wall is not None and wall < landing:
+            return wall
+        return landing
+
+    """ The x-position where the projectile stops when time is continuous (no ticks) """
+    def impactX(self):
+        x, y = self.positionAt(self.stopTime())
+        return min(max(x, self.xLower), self.xUpper)
+
+    """ The highest point (x, y) of the trajectory. If the projectile is already falling this is the current position """
+    def apex(self):
+        if self.yvel <= 0:
+            return self.xPos, self.yPos
+        return self.positionAt(self.yvel / 9.8)
+
+    """ 
+        Move the projectile to where it stops, giving the same result as calling update(time) 
+        while isMoving() is true. Returns the number of ticks that loop would have taken.
+    """
+    def resolve(self, time):
+        if not self.isMoving():
+            return 0
+
+        ticks = max(1, ceil(self.stopTime() / time))
+        # Correct for rounding, the stopping rule is checked at whole ticks
+        while ticks > 1 and self._stoppedAt((ticks-1) * time):
+            ticks -= 1
+        while not self._stoppedAt(ticks * time):
+            ticks += 1
+
+        if self.trace is not None:
+            # Fill in the ticks that are skipped, as if the projectile had been stepped
+            for tick in range(1, ticks):
+                x, y = self.positionAt(tick * time)
+                self.trace.record(time, min(max(x, self.xLower), self.xUpper), max(y, 0))
+
+        elapsed = ticks * time
+        x, y = self.positionAt(elapsed)
+        self.yPos = max(y, 0)
+        self.xPos = min(max(x, self.xLower), self.xUpper)
+        self.xvel = self.xvel + self.wind*elapsed
+        self.yvel = self.yvel - 9.8*elapsed
+        if self.trace is not None:
+            self.trace.record(time, self.xPos, self.yPos)
+        return ticks
+
+    def _stoppedAt(self, t):
+        x, y = self.positionAt(t)
+        return not (0 < y and self.xLower < x < self.xUpper)
+
     def getX(self):
         return self.xPos
 
     """ The current y-position (height) of the projectile". Should never be below 0. """
     def getY(self):
         return self.yPos
+
+    """ Start recording the path of this projectile, from its current position. At most capacity
+    positions are kept, after that the oldest are overwritten. If timeStep is given the capacity is
+    instead just enough for the rest of the flight in ticks of timeStep. Returns the TraceRecorder """
+    def startTrace(self, capacity=4096, timeStep=None):
+        if timeStep is not None:
+            # the start, the ticks of the flight and one more in case the tick count rounds up
+            capacity = ceil(self.stopTime() / timeStep) + 2 if self.isMoving() else 1
+        self.trace = TraceRecorder(capacity)
+        self.trace.record(0.0, self.xPos, self.yPos)
+        return self.trace
+
+    """ The TraceRecorder of this projectile, or None if its path is not recorded """
+    def getTrace(self):
+        return self.trace
+
+
+""" Records the path of a projectile as (t, x, y) samples. The samples are stored in a ring buffer
+of doubles that is allocated up front, so recording a sample never allocates. When the buffer
+is full the oldest samples are overwritten """
+class TraceRecorder:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.data = array('d', [0.0]) * (3*capacity)
+        self.count = 0
+        self.time = 0.0
+
+    """ Add a sample, dt seconds after the previous one """
+    def record(self, dt, x, y):
+        self.time = self.time + dt
+        i = 3*(self.count % self.capacity)
+        data = self.data
+        data[i] = self.time
+        data[i+1] = x
+        data[i+2] = y
+        self.count = self.count + 1
+
+    """ The number of samples kept """
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    """ The samples kept as a flat array('d') of t, x, y triples, oldest first """
+    def toArray(self):
+        if self.count <= self.capacity:
+            return self.data[:3*self.count]
+        split = 3*(self.count % self.capacity)
+        return self.data[split:] + self.data[:split]
+
+    """ The samples kept as a list of (t, x, y) tuples, oldest first """
+    def getSamples(self):
+        data = self.toArray()
+        return [tuple(data[i:i+3]) for i in range(0, len(data), 3)]
+
+    """ The samples kept as a NumPy array of shape (samples, 3) """
+    def asarray(self):
+        if _numpy() is None:
+            raise ImportError("TraceRecorder.asarray requires numpy")
+        return np.frombuffer(self.toArray(), dtype=float).reshape(-1, 3)
+
+    """ A new recorder with every step:th sample. The last sample, where the projectile stopped, is always kept """
+    def downsample(self, step):
+        data = self.toArray()
+        last = len(data) // 3 - 1
+        indices = list(range(0, last, step)) + [last] if last >= 0 else []
+        trace = TraceRecorder(max(len(indices), 1))
+        for i in indices:
+            trace.data[3*trace.count:3*trace.count+3] = data[3*i:3*i+3]
+            trace.count = trace.count + 1
+        trace.time = self.time
+        return trace
+
+    """ Save the samples kept to a NumPy .npy file of shape (samples, 3). numpy is not needed for this """
+    def save(self, path):
+        data = self.toArray()
+        if sys.byteorder != "little":
+            data.byteswap()
+        header = "{{'descr': '<f8', 'fortran_order': False, 'shape': ({}, 3), }}".format(len(data) // 3)
+        # The header is padded with spaces and ended by a newline so the data starts at a multiple of 64 bytes
+        header = header + " " * (63 - (10 + len(header)) % 64) + "\n"
+        with open(path, "wb") as f:
+            f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+            data.tofile(f)
+
+
+""" Models many projectiles at once, stored as parallel NumPy arrays (one element per projectile) """
+class ProjectileBatch:
+    """
+        Constructor parameters are the same as for Projectile, but each may be
+        either a single value or an array with one value per projectile.
+    """
+    def __init__(self, angle, velocity, wind, xPos, yPos, xLower, xUpper):
+        if _numpy() is None:
+            raise ImportError("ProjectileBatch requires numpy")
+        theta, velocity, wind, xPos, yPos, xLower, xUpper = np.broadcast_arrays(
+            np.radians(np.asarray(angle, dtype=float)), np.asarray(velocity, dtype=float),
+            wind, xPos, yPos, xLower, xUpper)
+        self.xPos = np.array(xPos, dtype=float)
+        self.yPos = np.array(yPos, dtype=float)
+        self.xLower = np.array(xLower, dtype=float)
+        self.xUpper = np.array(xUpper, dtype=float)
+        self.xvel = velocity*np.cos(theta)
+        self.yvel = velocity*np.sin(theta)
+        self.wind = np.array(wind, dtype=float)
+
+    def __len__(self):
+        return len(self.xPos)
+
+    """ 
+        Advance time for every projectile that is still moving. Stopped projectiles are left
+        untouched, so each element follows the loop "while proj.isMoving(): proj.update(time)"
+    """
+    def update(self, time):
+        moving = self.isMoving()
+        xvel, yvel = self.xvel[moving], self.yvel[moving]
+        yvel1 = yvel - 9.8*time
+        xvel1 = xvel + self.wind[moving]*time
+
+        xPos = self.xPos[moving] + time * (xvel + xvel1) / 2.0
+        yPos = self.yPos[moving] + time * (yvel + yvel1) / 2.0
+
+        self.yPos[moving] = np.maximum(yPos, 0)
+        self.xPos[moving] = np.minimum(np.maximum(xPos, self.xLower[moving]), self.xUpper[moving])
+
+        self.yvel[moving] = yvel1
+        self.xvel[moving] = xvel1
+
+    """ A boolean mask of the projectiles that have not yet hit the ground or a wall """
+    def isMoving(self):
+        return (0 < self.yPos) & (self.xLower < self.xPos) & (self.xPos < self.xUpper)
+
+    """ Update all projectiles until every one has stopped. Returns the number of ticks each one took """
+    def run(self, time):
+        ticks = np.zeros(len(self), dtype=int)
+        moving = self.isMoving()
+        while moving.any():
+            ticks += moving
+            self.update(time)
+            moving = self.isMoving()
+        return ticks
+
+    def getX(self):
+        return self.xPos
+
+    def getY(self):
+        return self.yPos
+
+    """ Add projectiles (Projectile objects) to the end of the batch, in their current state """
+    def add(self, projectiles):
+        fields = ("xPos", "yPos", "xLower", "xUpper", "xvel", "yvel", "wind")
+        for field in fields:
+            values = np.array([getattr(proj, field) for proj in projectiles], dtype=float)
+            setattr(self, field, np.concatenate((getattr(self, field), values)))
+
+    """ Take the projectiles selected by a boolean mask out of the batch. Returns them as Projectile objects """
+    def remove(self, mask):
+        removed = [self.getProjectile(i) for i in np.flatnonzero(mask)]
+        keep = ~mask
+        for field in ("xPos", "yPos", "xLower", "xUpper", "xvel", "yvel", "wind"):
+            setattr(self, field, getattr(self, field)[keep])
+        return removed
+
+    """ A Projectile with the current state of projectile number i """
+    def getProjectile(self, i):
+        proj = Projectile(0, 0, float(self.wind[i]), float(self.xPos[i]), float(self.yPos[i]),
+                          float(self.xLower[i]), float(self.xUpper[i]))
+        proj.xvel = float(self.xvel[i])
+        proj.yvel = float(self.yvel[i])
+        return proj
+
+
+"""
+    The projectiles in flight in a game. Each has an id, unique within the game, and the number of
+    the player that fired it. With numpy they are kept in a ProjectileBatch and every step advances
+    all of them with a few array operations, otherwise they are kept in a list of Projectile.
+"""
+class ActiveProjectiles:
+    def __init__(self, batched=None):
+        if batched is None:
+            batched = _numpy() is not None
+        self.nextId = 0
+        if batched:
+            self.batch = ProjectileBatch([], [], 0, 0, 0, 0, 0)
+            self.ids = np.zeros(0, dtype=int)
+            self.owners = np.zeros(0, dtype=int)
+        else:
+            self.batch = None
+            self.projectiles = []
+            self.ids = []
+            self.owners = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    """ Add projectiles fired by player number playerNr. Returns their ids """
+    def add(self, playerNr, projectiles):
+        if not projectiles:
+            return []
+        ids = list(range(self.nextId, self.nextId + len(projectiles)))
+        self.nextId = self.nextId + len(projectiles)
+        if self.batch is not None:
+            self.batch.add(projectiles)
+            self.ids = np.concatenate((self.ids, ids))
+            self.owners = np.concatenate((self.owners, [playerNr]*len(ids)))
+        else:
+            self.projectiles.extend(projectiles)
+            self.ids.extend(ids)
+            self.owners.extend([playerNr]*len(ids))
+        return ids
+
+    """
+        Advance every projectile that is still moving by time seconds, then take out the ones that
+        have stopped. Returns those as a list of (id, player number, Projectile)
+    """
+    def step(self, time):
+        if self.batch is not None:
+            self.batch.update(time)
+            stopped = ~self.batch.isMoving()
+            if not stopped.any():
+                return []
+            landed = list(zip(self.ids[stopped].tolist(), self.owners[stopped].tolist(), self.batch.remove(stopped)))
+            self.ids, self.owners = self.ids[~stopped], self.owners[~stopped]
+            return landed
+
+        landed = []
+        flying = ([], [], [])
+        for proj, id, owner in zip(self.projectiles, self.ids, self.owners):
+            if proj.isMoving():
+                proj.update(time)
+            if proj.isMoving():
+                for values, value in zip(flying, (proj, id, owner)):
+                    values.append(value)
+            else:
+                landed.append((id, owner, proj))
+        self.projectiles, self.ids, self.owners = flying
+        return landed
+
+    """ The ids and x- and y-positions of the projectiles in flight, as three sequences """
+    def getPositions(self):
+        if self.batch is not None:
+            return self.ids, self.batch.getX(), self.batch.getY()
+        return self.ids, [proj.getX() for proj in self.projectiles], [proj.getY() for proj in self.projectiles]
+
+
+""" The positive roots of a*t^2 + b*t + c = 0, in increasing order """
+def _positiveRoots(a, b, c):
+    if a == 0:
+        if b == 0:
+            return []
+        roots = [-c / b]
+    else:
+        disc = b*b - 4*a*c
+        if disc < 0:
+            return []
+        # Numerically stable form, avoids cancellation when b*b >> 4*a*c
+        q = -(b + sqrt(disc)) / 2.0 if b >= 0 else -(b - sqrt(disc)) / 2.0
+        roots = [q / a, c / q] if q != 0 else [0.0]
+    return sorted(t for t in roots if t > 0)
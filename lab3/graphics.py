@@ -42,6 +42,8 @@ The library provides the following graphical objects:
     Oval
     Rectangle
     Polygon
+    Polyline (many points, drawn as one item)
+    PointCloud (many single pixels, drawn as one image)
     Text
     Entry (for text-based input)
     Image
@@ -55,6 +57,17 @@ manipulation, Pixmap. A pixmap can be loaded from a file and displayed
 using an Image object. Both getPixel and setPixel methods are provided
 for manipulating the image.
 
+BACKENDS: By default drawing is done with Tkinter. Setting the
+environment variable GRAPHICS_BACKEND to "null" (or calling
+setBackend("null") before the first window is created) keeps the whole
+object model working without ever touching Tk, so no display is
+needed. The "record" backend is the same, but each window also logs
+the canvas calls it would have made in its log attribute.
+
+PROFILING: startProfiling() counts the canvas calls of all windows and
+times each update, telling apart the time spent in the program, in
+the frame rate sleep and in Tk. See Profiler.report().
+
 DOCUMENTATION: For complete documentation, see Chapter 4 of "Python
 Programming: An Introduction to Computer Science" by John Zelle,
 published by Franklin, Beedle & Associates.  Also see
@@ -161,11 +174,21 @@ __version__ = "5.0"
 #     Added Entry boxes.
 
 import time, os, sys
+from array import array
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
 except:
-   import Tkinter as tk
+   try:
+      import Tkinter as tk
+   except:
+      tk = None  # only the headless backends are available
+
+def _numpy():
+    # numpy is optional and is not imported here, so that importing this
+    # module stays cheap. If the program hasn't imported it, no argument
+    # can be a NumPy array
+    return sys.modules.get("numpy")
 
 
 ##########################################################################
@@ -180,45 +203,588 @@ UNSUPPORTED_METHOD = "Object doesn't support operation"
 BAD_OPTION = "Illegal option value"
 
 ##########################################################################
-# global variables and funtions
+# Backends
+#
+# Everything that talks to Tk goes through _backend. The null classes
+# below stand in for the Tkinter classes the library uses. They keep
+# the state the graphics objects rely on (item ids, coordinates and
+# options, entry text, image pixels) but have no window and no events.
+
+class _NullRoot:
+    """Stands in for the hidden tk.Tk root window"""
+
+    def update(self): pass
+    def update_idletasks(self): pass
+    def withdraw(self): pass
+    def destroy(self): pass
+
+
+class _NullToplevel:
+    """Stands in for the tk.Toplevel holding a GraphWin"""
+
+    def __init__(self, master=None):
+        self._title = ""
+
+    def title(self, text=None):
+        if text is None:
+            return self._title
+        self._title = text
+
+    def protocol(self, name, func): pass
+    def resizable(self, width, height): pass
+    def lift(self): pass
+    def destroy(self): pass
+
+
+class _NullWidget:
+    """Stands in for the tk.Frame and tk.Entry widgets used by Entry"""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = options
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def pack(self): pass
+    def focus_set(self): pass
+
+
+class _NullVar:
+    """Stands in for tk.StringVar"""
+
+    def __init__(self, master=None, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
 
-_root = tk.Tk()
-_root.withdraw()
 
-_update_lasttime = time.time()
+_NULL_COLORS = {"black": (0,0,0), "white": (255,255,255), "red": (255,0,0),
+                "green": (0,255,0), "blue": (0,0,255), "yellow": (255,255,0),
+                "gray": (190,190,190), "grey": (190,190,190)}
 
-def update(rate=None):
-    global _update_lasttime
+class _NullPhoto:
+    """Stands in for tk.PhotoImage. Pixels are kept as RGB bytes, only
+    #rrggbb and a few named colors are understood."""
+
+    def __init__(self, master=None, width=0, height=0, file=None):
+        if file is not None:
+            raise GraphicsError("the {} backend can't load image files".format(_backend.name))
+        self.w = int(width)
+        self.h = int(height)
+        self.pixels = bytearray(3*self.w*self.h)
+
+    def width(self): return self.w
+    def height(self): return self.h
+
+    def get(self, x, y):
+        i = 3*(y*self.w + x)
+        return tuple(self.pixels[i:i+3])
+
+    def put(self, data, to=None):
+        rows = [row.split() for row in data.strip("{}").split("} {")]
+        x0, y0 = (to[0], to[1]) if to else (0, 0)
+        for dy, row in enumerate(rows):
+            for dx, color in enumerate(row):
+                i = 3*((y0+dy)*self.w + x0 + dx)
+                self.pixels[i:i+3] = bytes(_nullColor(color))
+
+    def readRGB(self, x, y, width, height):
+        # Bulk access used by Image.getPixels/setPixels
+        data = bytearray()
+        for row in range(y, y+height):
+            i = 3*(row*self.w + x)
+            data += self.pixels[i:i+3*width]
+        return data
+
+    def writeRGB(self, data, x, y, width, height):
+        for row in range(height):
+            i = 3*((y+row)*self.w + x)
+            self.pixels[i:i+3*width] = data[3*row*width:3*(row+1)*width]
+
+    def copy(self):
+        other = _NullPhoto(width=self.w, height=self.h)
+        other.pixels[:] = self.pixels
+        return other
+
+    def write(self, filename, format=None):
+        if format not in ("ppm", "pnm"):
+            raise GraphicsError("the {} backend can only save ppm images".format(_backend.name))
+        with open(filename, "wb") as f:
+            f.write("P6 {} {} 255\n".format(self.w, self.h).encode("ascii"))
+            f.write(self.pixels)
+
+def _nullColor(color):
+    if color.startswith("#") and len(color) == 7:
+        return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+    if color in _NULL_COLORS:
+        return _NULL_COLORS[color]
+    raise GraphicsError(BAD_OPTION)
+
+
+class _NullCanvas:
+    """Stands in for tk.Canvas. Items are kept as [type, coords, options]
+    so they can still be moved, reconfigured and inspected."""
+
+    def __init__(self, master, width=200, height=200, **options):
+        self.master = master
+        self.options = dict(options, width=width, height=height)
+        self.canvasItems = {}
+        self.lastId = 0
+        self.timers = []
+
+    def _record(self, method, *args):
+        # Hook for _RecordingCanvas
+        pass
+
+    def _create(self, kind, args, options):
+        args = list(args)
+        if args and isinstance(args[-1], dict):
+            options = dict(args.pop(), **options)
+        self.lastId = self.lastId + 1
+        self.canvasItems[self.lastId] = [kind, [float(a) for a in args], dict(options)]
+        self._record("create_" + kind, self.lastId, args, options)
+        return self.lastId
+
+    def create_line(self, *args, **options): return self._create("line", args, options)
+    def create_rectangle(self, *args, **options): return self._create("rectangle", args, options)
+    def create_oval(self, *args, **options): return self._create("oval", args, options)
+    def create_polygon(self, *args, **options): return self._create("polygon", args, options)
+    def create_text(self, *args, **options): return self._create("text", args, options)
+    def create_window(self, *args, **options): return self._create("window", args, options)
+    def create_image(self, *args, **options): return self._create("image", args, options)
+
+    def move(self, item, dx, dy):
+        self._record("move", item, dx, dy)
+        coords = self.canvasItems[item][1]
+        for i in range(0, len(coords), 2):
+            coords[i] = coords[i] + dx
+            coords[i+1] = coords[i+1] + dy
+
+    def coords(self, item, *args):
+        if not args:
+            return list(self.canvasItems[item][1])
+        self._record("coords", item, args)
+        self.canvasItems[item][1] = [float(a) for a in args]
+
+    def itemconfig(self, item, options=None, **kw):
+        options = dict(options or {}, **kw)
+        self._record("itemconfig", item, options)
+        self.canvasItems[item][2].update(options)
+
+    def itemcget(self, item, option):
+        return self.canvasItems[item][2].get(option, "")
+
+    def type(self, item):
+        return self.canvasItems[item][0]
+
+    def find_all(self):
+        return tuple(self.canvasItems)
+
+    def delete(self, item):
+        self._record("delete", item)
+        self.canvasItems.pop(item, None)
+
+    def config(self, **options):
+        self._record("config", options)
+        self.options.update(options)
+
+    def after(self, ms, func):
+        self.timers.append(func)
+        return func
+
+    def after_cancel(self, timer):
+        if timer in self.timers:
+            self.timers.remove(timer)
+
+    def wait_variable(self, var):
+        # There are no events, only timers can change var. They fire at
+        # once, as if their time had passed.
+        value = var.get()
+        timers = self.timers
+        self.timers = []
+        for func in timers:
+            func()
+        if var.get() == value:
+            raise GraphicsError("no input events in the {} backend".format(_backend.name))
+
+    def bind(self, sequence, func): pass
+    def bind_all(self, sequence, func): pass
+    def pack(self): pass
+    def update(self): pass
+    def update_idletasks(self): pass
+
+
+class _RecordingCanvas(_NullCanvas):
+    """A _NullCanvas that logs every call that changes the canvas"""
+
+    def __init__(self, master, width=200, height=200, **options):
+        _NullCanvas.__init__(self, master, width, height, **options)
+        self.log = []
+
+    def _record(self, method, *args):
+        self.log.append((method,) + args)
+
+
+class _NullBackend:
+    name = "null"
+    Tk = _NullRoot
+    Toplevel = _NullToplevel
+    Canvas = _NullCanvas
+    Frame = _NullWidget
+    Entry = _NullWidget
+    StringVar = _NullVar
+    PhotoImage = _NullPhoto
+
+class _RecordingBackend(_NullBackend):
+    name = "record"
+    Canvas = _RecordingCanvas
+
+_BACKENDS = {"null": _NullBackend, "record": _RecordingBackend}
+
+if tk:
+    class _TkBackend:
+        name = "tk"
+        Tk = tk.Tk
+        Toplevel = tk.Toplevel
+        Canvas = tk.Canvas
+        Frame = tk.Frame
+        Entry = tk.Entry
+        StringVar = tk.StringVar
+        PhotoImage = tk.PhotoImage
+
+    _BACKENDS["tk"] = _TkBackend
+
+def _getBackend(name):
+    # The backend class called name, or a GraphicsError naming the backends there are
+    if name not in _BACKENDS:
+        raise GraphicsError("unknown backend {!r}, the backends are {}".format(
+            name, ", ".join(sorted(_BACKENDS))))
+    return _BACKENDS[name]
+
+_backend = _getBackend(os.environ.get("GRAPHICS_BACKEND", "tk" if tk else "null"))
+
+def setBackend(name):
+    """Select the backend ("tk", "null" or "record"). Must be called
+    before the first GraphWin is created."""
+    global _backend, _root
+    backend = _getBackend(name)
+    if GraphWin.windowCount:
+        raise GraphicsError("can't change backend after a window has been created")
+    if _root is not None:
+        _root.destroy()
+        _root = None
+    _backend = backend
+    GraphWin.__bases__ = (_backend.Canvas,)
+
+def getBackend():
+    """Return the name of the current backend"""
+    return _backend.name
+
+##########################################################################
+# global variables and funtions
+
+# The hidden root window is created by _getRoot() when it is first
+# needed, so importing the module doesn't start Tcl/Tk
+_root = None
+
+def _getRoot():
+    global _root
+    if _root is None:
+        _root = _backend.Tk()
+        _root.withdraw()
+        _root.update()  # MacOS fix 1
+    return _root
+
+class Pacer:
+
+    """Keeps animation frames at a steady rate. Every frame has a
+    deadline on the clock (perf_counter by default), one period after
+    the deadline of the previous frame, so the time spent drawing and
+    the sleep overshoot don't add up to drift. A frame that is late is
+    not waited for, and the following frames catch up. When more than
+    maxLag seconds behind (or when the rate changes) the pacer starts
+    over from the current time instead, dropping the missed frames.
+    With spin, the last spin seconds before a deadline are busy-waited,
+    as sleep tends to wake up late. That costs CPU time, so it is off
+    by default. clock and sleep can be replaced, e.g. by a fake clock
+    in tests."""
+
+    def __init__(self, maxLag=0.1, spin=0.0, clock=time.perf_counter, sleep=time.sleep):
+        self.maxLag = maxLag
+        self.spin = spin
+        self.clock = clock
+        self.sleep = sleep
+        self.rate = None
+        self.deadline = None
+        self.resetStats()
+
+    def resetStats(self):
+        self.frames = 0
+        self.resyncs = 0   # times the pacer fell behind and started over
+        self.lateSum = 0.0
+        self.lateSquares = 0.0
+        self.lateMax = 0.0
+
+    def schedule(self, rate):
+        """The time on the clock at which the next frame is due"""
+        now = self.clock()
+        if self.deadline is None or rate != self.rate:
+            self.deadline = now
+        elif now - self.deadline > self.maxLag:
+            self.deadline = now
+            self.resyncs = self.resyncs + 1
+        self.rate = rate
+        deadline = self.deadline
+        self.deadline = deadline + 1/rate
+        return deadline
+
+    def wait(self, rate):
+        """Sleep until the next frame is due, returns the deadline"""
+        deadline = self.schedule(rate)
+        pause = deadline - self.clock() - self.spin
+        if pause > 0:
+            self.sleep(pause)
+        if self.spin:
+            while self.clock() < deadline:
+                pass
+        self.woke(deadline)
+        return deadline
+
+    def woke(self, deadline):
+        """Record how late a frame started, for the jitter statistics"""
+        late = max(self.clock() - deadline, 0.0)
+        self.frames = self.frames + 1
+        self.lateSum = self.lateSum + late
+        self.lateSquares = self.lateSquares + late*late
+        self.lateMax = max(self.lateMax, late)
+
+    def stats(self):
+        """Frames paced since the last resetStats, and the mean, standard
+        deviation (jitter) and maximum of how late they started, in seconds"""
+        n = max(self.frames, 1)
+        mean = self.lateSum / n
+        return {"frames": self.frames, "resyncs": self.resyncs, "mean": mean,
+                "jitter": max(self.lateSquares / n - mean*mean, 0.0) ** 0.5,
+                "max": self.lateMax}
+
+    def report(self):
+        stats = self.stats()
+        return ("{frames} frames paced, {resyncs} resyncs, late by mean {0:.2f} ms "
+                "jitter {1:.2f} ms max {2:.2f} ms").format(
+                    stats["mean"] * 1000, stats["jitter"] * 1000, stats["max"] * 1000, **stats)
+
+# The pacer of update(), windows have their own (GraphWin.pacer)
+_pacer = Pacer()
+
+def update(rate=None, pacer=None):
+    """Process pending events and redraw. With a rate, first wait for
+    the next frame so that calls are rate times per second, paced by
+    pacer (or the module pacer shared by all callers)"""
+    if _profiler:
+        start = time.perf_counter()
+    pauseLength = 0
     if rate:
-        now = time.time()
-        pauseLength = 1/rate-(now-_update_lasttime)
-        if pauseLength > 0:
-            time.sleep(pauseLength)
-            _update_lasttime = now + pauseLength
-        else:
-            _update_lasttime = now
+        deadline = (pacer or _pacer).wait(rate)
+        if _profiler:
+            pauseLength = max(deadline - start, 0)
+
+    if _profiler:
+        slept = time.perf_counter()
+        _getRoot().update()
+        _profiler.frame(start, pauseLength, slept, time.perf_counter())
+    else:
+        _getRoot().update()
+
+async def updateAsync(rate=None, pacer=None):
+    """Like update, but the pause is an asyncio.sleep so other tasks
+    can run in the meantime"""
+    import asyncio  # only programs using asyncio pay for importing it
+    start = time.perf_counter()
+    pauseLength = 0
+    if rate:
+        pacer = pacer or _pacer
+        deadline = pacer.schedule(rate)
+        pauseLength = max(deadline - pacer.clock(), 0)
+        await asyncio.sleep(pauseLength)
+        pacer.woke(deadline)
+    else:
+        await asyncio.sleep(0)
+    if _profiler:
+        slept = time.perf_counter()
+        _getRoot().update()
+        _profiler.frame(start, pauseLength, slept, time.perf_counter())
+    else:
+        _getRoot().update()
+
+# While asyncio code waits for input, a task keeps processing Tk events.
+# It ends when no coroutine is waiting any more, so an idle program
+# doesn't keep waking up
+PUMP_INTERVAL = 1/100
+_pumpTask = None
+_pumpWaiters = 0
+
+async def _pumpEvents():
+    import asyncio
+    while _pumpWaiters:
+        _getRoot().update()
+        await asyncio.sleep(PUMP_INTERVAL)
+
+def _ensurePump():
+    # Called by every coroutine that starts waiting for input, which
+    # calls _releasePump when it is done
+    global _pumpTask, _pumpWaiters
+    import asyncio
+    _pumpWaiters = _pumpWaiters + 1
+    loop = asyncio.get_running_loop()
+    if _pumpTask is None or _pumpTask.done() or _pumpTask.get_loop() is not loop:
+        _pumpTask = loop.create_task(_pumpEvents())
+
+def _releasePump():
+    global _pumpWaiters
+    _pumpWaiters = _pumpWaiters - 1
 
-    _root.update()
+##########################################################################
+# Profiling, off unless startProfiling() is called
+
+# The canvas calls that are counted
+PROFILED_CALLS = ("move", "coords", "itemconfig", "delete", "create_line",
+                  "create_rectangle", "create_oval", "create_polygon",
+                  "create_text", "create_window", "create_image")
+
+_profiler = None
+
+class Profiler:
+
+    """Counts the canvas calls made by all windows and times every call
+    to update: the time spent sleeping to keep the frame rate, the time
+    spent in Tk (root.update) and the time between frames (the program
+    itself, e.g. the physics)."""
+
+    def __init__(self, bucket=0.002, buckets=25):
+        self.bucket = bucket    # histogram bucket width in seconds
+        self.buckets = buckets  # the last bucket holds everything longer
+        self.reset()
+
+    def reset(self):
+        self.calls = dict.fromkeys(PROFILED_CALLS, 0)
+        self.frameCalls = 0
+        # One (interval, work, pause, sleep, tk, calls) tuple per frame
+        self.frames = []
+        self.lastFrame = None
+
+    def count(self, name):
+        self.calls[name] = self.calls[name] + 1
+        self.frameCalls = self.frameCalls + 1
+
+    def frame(self, start, pause, slept, end):
+        """Record a call to update that started at start, asked for a
+        pause of pause seconds, woke up at slept and ended at end"""
+        if self.lastFrame is None:
+            interval = work = 0.0
+        else:
+            interval, work = end - self.lastFrame, start - self.lastFrame
+        self.frames.append((interval, work, pause, slept - start,
+                            end - slept, self.frameCalls))
+        self.lastFrame = end
+        self.frameCalls = 0
+
+    def stats(self):
+        """Totals since the last reset, times in seconds. drift is how
+        much longer the sleeps were than asked for"""
+        frames = self.frames
+        return {"frames": len(frames),
+                "calls": sum(self.calls.values()),
+                "work": sum(f[1] for f in frames),
+                "sleep": sum(f[3] for f in frames),
+                "drift": sum(f[3] - f[2] for f in frames if f[2] > 0),
+                "tk": sum(f[4] for f in frames),
+                "maxCalls": max([f[5] for f in frames] or [0])}
+
+    def histogram(self, field="interval"):
+        """Number of frames per bucket of a field ("interval", "work",
+        "sleep" or "tk")"""
+        index = ("interval", "work", "pause", "sleep", "tk").index(field)
+        counts = [0] * self.buckets
+        for f in self.frames[1:] if index < 2 else self.frames:
+            counts[min(int(f[index] / self.bucket), self.buckets - 1)] += 1
+        return counts
+
+    def report(self):
+        stats = self.stats()
+        calls = ", ".join("{0} {1}".format(name, n)
+                          for name, n in self.calls.items() if n)
+        lines = ["{frames} frames, {calls} canvas calls (max {maxCalls} in a frame)".format(**stats),
+                 "  calls: " + (calls or "none"),
+                 "  time: program {0:.1f} ms, sleep {1:.1f} ms (drift {2:.1f} ms), tk {3:.1f} ms".format(
+                     stats["work"] * 1000, stats["sleep"] * 1000,
+                     stats["drift"] * 1000, stats["tk"] * 1000),
+                 "  frame interval histogram ({0:g} ms buckets):".format(self.bucket * 1000)]
+        counts = self.histogram()
+        for i, n in enumerate(counts):
+            if n:
+                lines.append("  {0:>5.0f}{1} ms {2:>6} {3}".format(
+                    i * self.bucket * 1000, "+" if i == self.buckets - 1 else " ",
+                    n, "#" * min(n, 50)))
+        return "\n".join(lines)
+
+def _countCalls(name):
+    def counted(self, *args, **options):
+        _profiler.count(name)
+        return getattr(super(GraphWin, self), name)(*args, **options)
+    counted.__name__ = name
+    return counted
+
+def startProfiling(profiler=None):
+    """Start counting canvas calls and timing update for all windows.
+    Returns the Profiler. Until this is called profiling costs nothing"""
+    global _profiler
+    if _profiler is None:
+        for name in PROFILED_CALLS:
+            setattr(GraphWin, name, _countCalls(name))
+    _profiler = profiler or Profiler()
+    return _profiler
+
+def stopProfiling():
+    """Stop profiling, returns the Profiler with the results"""
+    global _profiler
+    profiler = _profiler
+    if profiler is not None:
+        for name in PROFILED_CALLS:
+            delattr(GraphWin, name)
+        _profiler = None
+    return profiler
+
+def getProfiler():
+    """The active Profiler, or None"""
+    return _profiler
 
 ############################################################################
 # Graphics classes start here
         
-class GraphWin(tk.Canvas):
+class GraphWin(_backend.Canvas):
 
     """A GraphWin is a toplevel window for displaying graphics."""
 
+    windowCount = 0  # windows created so far, the backend is fixed after the first
+
     def __init__(self, title="Graphics Window",
                  width=200, height=200, autoflush=True):
         assert type(title) == type(""), "Title must be a string"
-        master = tk.Toplevel(_root)
+        GraphWin.windowCount = GraphWin.windowCount + 1
+        master = _backend.Toplevel(_getRoot())
         master.protocol("WM_DELETE_WINDOW", self.close)
-        tk.Canvas.__init__(self, master, width=width, height=height,
-                           highlightthickness=0, bd=0)
+        _backend.Canvas.__init__(self, master, width=width, height=height,
+                                 highlightthickness=0, bd=0)
         self.master.title(title)
         self.pack()
         master.resizable(0,0)
         self.foreground = "black"
-        self.items = []
+        self.items = {}  # drawn objects in drawing order, used as an ordered set
         self.mouseX = None
         self.mouseY = None
         self.bind("<Button-1>", self._onClick)
@@ -226,11 +792,16 @@ class GraphWin(tk.Canvas):
         self.height = int(height)
         self.width = int(width)
         self.autoflush = autoflush
+        self.pacer = Pacer()  # frame pacing of update(rate)
         self._mouseCallback = None
         self.trans = None
         self.closed = False
         master.lift()
         self.lastKey = ""
+        self.frameDepth = 0
+        self.pending = {}  # object -> [dx, dy, options, reshape] held back until endFrame
+        self.inputVar = _backend.StringVar(_getRoot())  # set on every click, key and close
+        self.inputWaiters = []  # futures of getMouseAsync/getKeyAsync calls
         if autoflush: _root.update()
 
     def __repr__(self):
@@ -250,6 +821,7 @@ class GraphWin(tk.Canvas):
 
     def _onKey(self, evnt):
         self.lastKey = evnt.keysym
+        self._notifyInput("key")
 
 
     def setBackground(self, color):
@@ -269,6 +841,7 @@ class GraphWin(tk.Canvas):
 
         if self.closed: return
         self.closed = True
+        self._notifyInput("closed")  # wake up getMouse/getKey
         self.master.destroy()
         self.__autoflush()
 
@@ -300,26 +873,120 @@ class GraphWin(tk.Canvas):
         self.create_line(x,y,x+1,y, fill=color)
         self.__autoflush()
       
+    def paceFrame(self, rate=None):
+        """Like the update function, but paced by the pacer of this
+        window, so animations in different windows don't disturb
+        each other's frame rate"""
+        update(rate, self.pacer)
+
+    async def paceFrameAsync(self, rate=None):
+        """Like updateAsync, paced by the pacer of this window"""
+        await updateAsync(rate, self.pacer)
+
     def flush(self):
         """Update drawing to the window"""
         self.__checkOpen()
         self.update_idletasks()
         
-    def getMouse(self):
-        """Wait for mouse click and return Point object representing
-        the click"""
+    def _waitInput(self, timeout):
+        # Block in the Tk event loop (using no CPU) until a click, a key,
+        # the window being closed or timeout seconds. False on timeout.
+        if timeout is not None and timeout <= 0: return False
+        var = self.inputVar
+        var.set("")
+        timer = None
+        if timeout is not None:
+            timer = self.after(int(timeout*1000), lambda: var.set("timeout"))
+        self.wait_variable(var)
+        if timer is not None:
+            self.after_cancel(timer)
+        return var.get() != "timeout"
+
+    def _notifyInput(self, kind):
+        self.inputVar.set(kind)
+        waiters = self.inputWaiters
+        self.inputWaiters = []
+        for future in waiters:
+            if not future.done():
+                future.set_result(kind)
+
+    async def _waitInputAsync(self, timeout):
+        # Same as _waitInput, but Tk events are processed by a task
+        # while this coroutine waits for a click, key or close
+        import asyncio
+        if timeout is not None and timeout <= 0: return False
+        _ensurePump()
+        future = asyncio.get_running_loop().create_future()
+        self.inputWaiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if future in self.inputWaiters:
+                self.inputWaiters.remove(future)
+            _releasePump()
+
+    # getMouse and getKey are written once, as generators that yield the
+    # timeout of every wait for input and are sent whether input came.
+    # _wait runs them blocking in Tk, _waitAsync as a coroutine
+
+    def _wait(self, waits):
+        try:
+            timeout = next(waits)
+            while True:
+                timeout = waits.send(self._waitInput(timeout))
+        except StopIteration as stop:
+            return stop.value
+
+    async def _waitAsync(self, waits):
+        try:
+            timeout = next(waits)
+            while True:
+                timeout = waits.send(await self._waitInputAsync(timeout))
+        except StopIteration as stop:
+            return stop.value
+
+    def _mouseWaits(self, timeout):
         self.update()      # flush any prior clicks
         self.mouseX = None
         self.mouseY = None
+        if timeout is not None: deadline = time.perf_counter() + timeout
         while self.mouseX == None or self.mouseY == None:
-            self.update()
             if self.isClosed(): raise GraphicsError("getMouse in closed window")
-            time.sleep(.1) # give up thread
+            if timeout is not None: timeout = deadline - time.perf_counter()
+            if not (yield timeout): return None
+        if self.isClosed(): raise GraphicsError("getMouse in closed window")
         x,y = self.toWorld(self.mouseX, self.mouseY)
         self.mouseX = None
         self.mouseY = None
         return Point(x,y)
 
+    def _keyWaits(self, timeout):
+        self.lastKey = ""
+        if timeout is not None: deadline = time.perf_counter() + timeout
+        while self.lastKey == "":
+            if self.isClosed(): raise GraphicsError("getKey in closed window")
+            if timeout is not None: timeout = deadline - time.perf_counter()
+            if not (yield timeout): return ""
+        key = self.lastKey
+        self.lastKey = ""
+        return key
+
+    async def getMouseAsync(self, timeout=None):
+        """Like getMouse, but other asyncio tasks run while waiting"""
+        return await self._waitAsync(self._mouseWaits(timeout))
+
+    async def getKeyAsync(self, timeout=None):
+        """Like getKey, but other asyncio tasks run while waiting"""
+        return await self._waitAsync(self._keyWaits(timeout))
+
+    def getMouse(self, timeout=None):
+        """Wait for mouse click and return Point object representing
+        the click. Returns None if timeout seconds pass without a click"""
+        return self._wait(self._mouseWaits(timeout))
+
     def checkMouse(self):
         """Return last mouse click or None if mouse has
         not been clicked since last call"""
@@ -334,17 +1001,10 @@ class GraphWin(tk.Canvas):
         else:
             return None
 
-    def getKey(self):
-        """Wait for user to press a key and return it as a string."""
-        self.lastKey = ""
-        while self.lastKey == "":
-            self.update()
-            if self.isClosed(): raise GraphicsError("getKey in closed window")
-            time.sleep(.1) # give up thread
-
-        key = self.lastKey
-        self.lastKey = ""
-        return key
+    def getKey(self, timeout=None):
+        """Wait for user to press a key and return it as a string.
+        Returns "" if timeout seconds pass without a key"""
+        return self._wait(self._keyWaits(timeout))
 
     def checkKey(self):
         """Return last key pressed or None if no key pressed since last call"""
@@ -376,6 +1036,23 @@ class GraphWin(tk.Canvas):
             return self.trans.world(x,y)
         else:
             return x,y
+
+    def toScreenMany(self, xs, ys):
+        """Convert sequences (NumPy arrays or array('d')) of world
+        coordinates to screen coordinates in one call"""
+        trans = self.trans
+        if trans:
+            return trans.screen_many(xs,ys)
+        else:
+            return xs,ys
+
+    def toWorldMany(self, xs, ys):
+        """Convert sequences of screen coordinates to world coordinates"""
+        trans = self.trans
+        if trans:
+            return trans.world_many(xs,ys)
+        else:
+            return xs,ys
         
     def setMouseHandler(self, func):
         self._mouseCallback = func
@@ -383,20 +1060,59 @@ class GraphWin(tk.Canvas):
     def _onClick(self, e):
         self.mouseX = e.x
         self.mouseY = e.y
+        self._notifyInput("click")
         if self._mouseCallback:
             self._mouseCallback(Point(e.x, e.y))
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[item] = None
 
     def delItem(self, item):
-        self.items.remove(item)
+        del self.items[item]
 
     def redraw(self):
-        for item in self.items[:]:
+        for item in list(self.items):
             item.undraw()
             item.draw(self)
         self.update()
+
+    def beginFrame(self):
+        """Start a frame. Until the matching endFrame, moves and option
+        changes of drawn objects are collected instead of being sent to
+        the canvas one by one. Frames may be nested."""
+        self.frameDepth = self.frameDepth + 1
+
+    def endFrame(self):
+        """End a frame, sending at most one move and one itemconfig per
+        changed object to the canvas"""
+        self.frameDepth = self.frameDepth - 1
+        if self.frameDepth > 0: return
+        self.frameDepth = 0
+        pending = self.pending
+        self.pending = {}
+        if self.isClosed(): return
+        for item, (dx, dy, options, reshape) in pending.items():
+            if reshape:
+                # new coordinates include the moves
+                self.coords(item.id, *item._screenCoords(self))
+            elif dx or dy:
+                self.move(item.id, dx, dy)
+            if options:
+                self.itemconfig(item.id, options)
+        self.__autoflush()
+
+    def _defer(self, item, dx, dy, options=None, reshape=False):
+        # Add a move (in screen units), option changes or a change of
+        # shape of item to the frame
+        change = self.pending.get(item)
+        if change is None:
+            change = self.pending[item] = [0, 0, {}, False]
+        change[0] = change[0] + dx
+        change[1] = change[1] + dy
+        if options:
+            change[2].update(options)
+        if reshape:
+            change[3] = True
         
                       
 class Transform:
@@ -426,6 +1142,31 @@ class Transform:
         y = self.ybase - ys*self.yscale
         return x,y
 
+    def screen_many(self,x,y):
+        # Bulk version of screen for sequences of coordinates. Returns
+        # NumPy integer arrays for NumPy input, array('l') otherwise
+        np = _numpy()
+        if np is not None and isinstance(x, np.ndarray):
+            xs = (np.asarray(x, dtype=float)-self.xbase) / self.xscale
+            ys = (self.ybase-np.asarray(y, dtype=float)) / self.yscale
+            return (xs+0.5).astype(int), (ys+0.5).astype(int)
+        xbase, xscale = self.xbase, self.xscale
+        ybase, yscale = self.ybase, self.yscale
+        return (array('l', [int((v-xbase)/xscale+0.5) for v in x]),
+                array('l', [int((ybase-v)/yscale+0.5) for v in y]))
+
+    def world_many(self,xs,ys):
+        # Bulk version of world. Returns NumPy float arrays for NumPy
+        # input, array('d') otherwise
+        np = _numpy()
+        if np is not None and isinstance(xs, np.ndarray):
+            return (np.asarray(xs, dtype=float)*self.xscale + self.xbase,
+                    self.ybase - np.asarray(ys, dtype=float)*self.yscale)
+        xbase, xscale = self.xbase, self.xscale
+        ybase, yscale = self.ybase, self.yscale
+        return (array('d', [v*xscale+xbase for v in xs]),
+                array('d', [ybase-v*yscale for v in ys]))
+
 
 # Default values for various item configuration options. Only a subset of
 #   keys may be present in the configuration dictionary for a given item
@@ -495,6 +1236,7 @@ class GraphicsObject:
         
         if not self.canvas: return
         if not self.canvas.isClosed():
+            self.canvas.pending.pop(self, None)
             self.canvas.delete(self.id)
             self.canvas.delItem(self)
             if self.canvas.autoflush:
@@ -518,6 +1260,9 @@ class GraphicsObject:
             else:
                 x = dx
                 y = dy
+            if canvas.frameDepth:
+                canvas._defer(self, x, y)
+                return
             self.canvas.move(self.id, x, y)
             if canvas.autoflush:
                 _root.update()
@@ -531,29 +1276,79 @@ class GraphicsObject:
         options = self.config
         options[option] = setting
         if self.canvas and not self.canvas.isClosed():
+            if self.canvas.frameDepth:
+                self.canvas._defer(self, 0, 0, {option: setting})
+                return
             self.canvas.itemconfig(self.id, options)
             if self.canvas.autoflush:
                 _root.update()
 
 
+    def _reshape(self):
+        # Internal method to send new coordinates of a drawn object to
+        # the canvas, without creating a new canvas item
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            if canvas.frameDepth:
+                canvas._defer(self, 0, 0, reshape=True)
+                return
+            canvas.coords(self.id, *self._screenCoords(canvas))
+            if canvas.autoflush:
+                _root.update()
+
     def _draw(self, canvas, options):
         """draws appropriate figure on canvas with options provided
         Returns Tk id of item drawn"""
         pass # must override in subclass
 
+    def _screenCoords(self, canvas):
+        """returns the screen coordinates of the figure, as passed to
+        the canvas coords method"""
+        raise GraphicsError(UNSUPPORTED_METHOD) # override in subclass that can change shape
+
 
     def _move(self, dx, dy):
         """updates internal state of object to move it dx,dy units"""
         pass # must override in subclass
 
          
+class _Vec:
+    # Internal lightweight point used to store the geometry of the
+    # other objects. It can't be drawn, so unlike Point it carries no
+    # config, canvas or id. Public methods still hand out Points.
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+
+    def __repr__(self):
+        return "Point({}, {})".format(self.x, self.y)
+
+    def move(self, dx, dy):
+        self.x = self.x + dx
+        self.y = self.y + dy
+
+    def clone(self):
+        return _Vec(self.x, self.y)
+
+    def toPoint(self):
+        return Point(self.x, self.y)
+
+    def getX(self): return self.x
+    def getY(self): return self.y
+
+
 class Point(GraphicsObject):
     def __init__(self, x, y):
         GraphicsObject.__init__(self, ["outline", "fill"])
-        self.setFill = self.setOutline
         self.x = float(x)
         self.y = float(y)
 
+    def setFill(self, color):
+        """A point has no interior, fill sets the outline color"""
+        self.setOutline(color)
+
     def __repr__(self):
         return "Point({}, {})".format(self.x, self.y)
         
@@ -579,8 +1374,8 @@ class _BBox(GraphicsObject):
     
     def __init__(self, p1, p2, options=["outline","width","fill"]):
         GraphicsObject.__init__(self, options)
-        self.p1 = p1.clone()
-        self.p2 = p2.clone()
+        self.p1 = _Vec(p1.x, p1.y)
+        self.p2 = _Vec(p2.x, p2.y)
 
     def _move(self, dx, dy):
         self.p1.x = self.p1.x + dx
@@ -588,15 +1383,20 @@ class _BBox(GraphicsObject):
         self.p2.x = self.p2.x + dx
         self.p2.y = self.p2.y  + dy
                 
-    def getP1(self): return self.p1.clone()
+    def getP1(self): return self.p1.toPoint()
 
-    def getP2(self): return self.p2.clone()
+    def getP2(self): return self.p2.toPoint()
     
     def getCenter(self):
         p1 = self.p1
         p2 = self.p2
         return Point((p1.x+p2.x)/2.0, (p1.y+p2.y)/2.0)
 
+    def _screenCoords(self, canvas):
+        x1,y1 = canvas.toScreen(self.p1.x,self.p1.y)
+        x2,y2 = canvas.toScreen(self.p2.x,self.p2.y)
+        return x1,y1,x2,y2
+
     
 class Rectangle(_BBox):
     
@@ -643,8 +1443,8 @@ class Oval(_BBox):
 class Circle(Oval):
     
     def __init__(self, center, radius):
-        p1 = Point(center.x-radius, center.y-radius)
-        p2 = Point(center.x+radius, center.y+radius)
+        p1 = _Vec(center.x-radius, center.y-radius)
+        p2 = _Vec(center.x+radius, center.y+radius)
         Oval.__init__(self, p1, p2)
         self.radius = radius
 
@@ -652,20 +1452,31 @@ class Circle(Oval):
         return "Circle({}, {})".format(str(self.getCenter()), str(self.radius))
         
     def clone(self):
-        other = Circle(self.getCenter(), self.radius)
+        p1 = self.p1
+        p2 = self.p2
+        other = Circle(_Vec((p1.x+p2.x)/2.0, (p1.y+p2.y)/2.0), self.radius)
         other.config = self.config.copy()
         return other
         
     def getRadius(self):
         return self.radius
 
+    def setRadius(self, radius):
+        """Change the radius, keeping the center. A drawn circle is
+        resized in place"""
+        x = (self.p1.x+self.p2.x)/2.0
+        y = (self.p1.y+self.p2.y)/2.0
+        self.p1.x, self.p1.y = x-radius, y-radius
+        self.p2.x, self.p2.y = x+radius, y+radius
+        self.radius = radius
+        self._reshape()
+
                   
 class Line(_BBox):
     
     def __init__(self, p1, p2):
         _BBox.__init__(self, p1, p2, ["arrow","fill","width"])
         self.setFill(DEFAULT_CONFIG['outline'])
-        self.setOutline = self.setFill
 
     def __repr__(self):
         return "Line({}, {})".format(str(self.p1), str(self.p2))
@@ -682,19 +1493,202 @@ class Line(_BBox):
         x2,y2 = canvas.toScreen(p2.x,p2.y)
         return canvas.create_line(x1,y1,x2,y2,options)
         
+    def setOutline(self, color):
+        """A line has no interior, outline sets the fill color"""
+        self.setFill(color)
+
     def setArrow(self, option):
         if not option in ["first","last","both","none"]:
             raise GraphicsError(BAD_OPTION)
         self._reconfig("arrow", option)
         
 
+class Polyline(GraphicsObject):
+
+    """A line through any number of points, drawn as a single canvas
+    item. Points are kept in array('d') buffers and can be appended
+    while the line is drawn, e.g. to trace a moving object."""
+
+    def __init__(self, xs=(), ys=()):
+        GraphicsObject.__init__(self, ["arrow","fill","width"])
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+        self.setFill(DEFAULT_CONFIG['outline'])
+
+    def __repr__(self):
+        return "Polyline({} points)".format(len(self.xs))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def clone(self):
+        other = Polyline(self.xs, self.ys)
+        other.config = self.config.copy()
+        return other
+
+    def setOutline(self, color):
+        self.setFill(color)
+
+    def getPoints(self):
+        return [Point(x,y) for x,y in zip(self.xs, self.ys)]
+
+    def append(self, x, y):
+        """Add a point to the end of the line"""
+        self.xs.append(x)
+        self.ys.append(y)
+        self._reshape()
+
+    def extend(self, xs, ys):
+        """Add several points (sequences or NumPy arrays of x and y)"""
+        self.xs.extend(array('d', xs))
+        self.ys.extend(array('d', ys))
+        self._reshape()
+
+    def _move(self, dx, dy):
+        self.xs = array('d', [x+dx for x in self.xs])
+        self.ys = array('d', [y+dy for y in self.ys])
+
+    def _screenCoords(self, canvas):
+        xs,ys = canvas.toScreenMany(self.xs, self.ys)
+        coords = [0]*(2*len(xs))
+        coords[0::2] = xs
+        coords[1::2] = ys
+        # A canvas line needs at least two points
+        while len(coords) < 4:
+            coords.extend(coords[-2:] or [0, 0])
+        return coords
+
+    def _draw(self, canvas, options):
+        return canvas.create_line(*self._screenCoords(canvas), options)
+
+
+class PointCloud(GraphicsObject):
+
+    """Any number of single-pixel points drawn into one image the size
+    of the window, so the number of canvas items doesn't grow with the
+    number of points. Points can be added while it is drawn; they get
+    the fill color set when they are added."""
+
+    def __init__(self, xs=(), ys=(), color="black"):
+        GraphicsObject.__init__(self, [])
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+        self.colors = [color]*len(self.xs)
+        self.color = color
+        self.img = None
+        self.rgba = None  # the pixels of img while drawn, 4 bytes each
+        self.shift = [0.0, 0.0]  # world moves since the image was drawn
+
+    def __repr__(self):
+        return "PointCloud({} points)".format(len(self.xs))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def setFill(self, color):
+        self.color = color
+
+    def setOutline(self, color):
+        self.color = color
+
+    def getPoints(self):
+        return [Point(x,y) for x,y in zip(self.xs, self.ys)]
+
+    def append(self, x, y):
+        self.extend([x], [y])
+
+    def extend(self, xs, ys):
+        """Add several points (sequences or NumPy arrays of x and y)"""
+        start = len(self.xs)
+        self.xs.extend(array('d', xs))
+        self.ys.extend(array('d', ys))
+        self.colors.extend([self.color]*(len(self.xs)-start))
+        if self.canvas and not self.canvas.isClosed():
+            self._plot(self.canvas, start)
+
+    def _plot(self, canvas, start):
+        # Put points start.. into the image, in the coordinates it had
+        # when it was drawn. The points are set in self.rgba, a copy of
+        # the whole image, and the region around them is sent to Tk in
+        # a single put, as a PNG so that the rest stays transparent
+        xs = array('d', [x-self.shift[0] for x in self.xs[start:]])
+        ys = array('d', [y-self.shift[1] for y in self.ys[start:]])
+        xs,ys = canvas.toScreenMany(xs, ys)
+        w, h = self.img.width(), self.img.height()
+        null = isinstance(self.img, _NullPhoto)
+        rgba = self.rgba
+        rgbs = {}
+        x0, y0, x1, y1 = w, h, -1, -1
+        for x, y, color in zip(xs, ys, self.colors[start:]):
+            if 0 <= x < w and 0 <= y < h:
+                if color not in rgbs:
+                    rgbs[color] = (_nullColor(color) if null else
+                                   tuple(v // 257 for v in canvas.winfo_rgb(color))) + (255,)
+                i = 4*(y*w + x)
+                rgba[i:i+4] = bytes(rgbs[color])
+                x0, y0, x1, y1 = min(x0, x), min(y0, y), max(x1, x), max(y1, y)
+        if x1 < 0: return
+        if null:
+            self.img.writeRGB(_dropAlpha(rgba, w, x0, y0, x1+1, y1+1), x0, y0, x1+1-x0, y1+1-y0)
+        else:
+            self.img.put(_pngRegion(rgba, w, x0, y0, x1+1, y1+1), (x0, y0))
+        if canvas.autoflush:
+            _root.update()
+
+    def _move(self, dx, dy):
+        self.xs = array('d', [x+dx for x in self.xs])
+        self.ys = array('d', [y+dy for y in self.ys])
+        self.shift[0] = self.shift[0] + dx
+        self.shift[1] = self.shift[1] + dy
+
+    def _draw(self, canvas, options):
+        w, h = canvas.getWidth(), canvas.getHeight()
+        self.img = _backend.PhotoImage(master=_getRoot(), width=w, height=h)
+        self.rgba = bytearray(4*w*h)
+        self.shift = [0.0, 0.0]
+        self._plot(canvas, 0)
+        return canvas.create_image(w//2, h//2, image=self.img)
+
+    def undraw(self):
+        GraphicsObject.undraw(self)
+        self.img = None
+        self.rgba = None
+
+
+def _region(rgba, width, x0, y0, x1, y1):
+    # The rows of the region x0..x1, y0..y1 (exclusive) of an RGBA
+    # buffer width pixels wide
+    return [rgba[4*(y*width+x0):4*(y*width+x1)] for y in range(y0, y1)]
+
+def _dropAlpha(rgba, width, x0, y0, x1, y1):
+    # The region as RGB bytes, for _NullPhoto.writeRGB. Unset pixels
+    # come out black, the null backend has no transparency
+    data = bytearray()
+    for row in _region(rgba, width, x0, y0, x1, y1):
+        del row[3::4]
+        data += row
+    return data
+
+def _pngRegion(rgba, width, x0, y0, x1, y1):
+    # The region as a base64 PNG with alpha, which PhotoImage.put reads
+    import base64, struct, zlib
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data +
+                struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+    rows = b"".join(b"\0" + row for row in _region(rgba, width, x0, y0, x1, y1))
+    png = (b"\x89PNG\r\n\x1a\n" +
+           chunk(b"IHDR", struct.pack(">IIBBBBB", x1-x0, y1-y0, 8, 6, 0, 0, 0)) +
+           chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+    return base64.b64encode(png).decode("ascii")
+
+
 class Polygon(GraphicsObject):
     
     def __init__(self, *points):
         # if points passed as a list, extract it
         if len(points) == 1 and type(points[0]) == type([]):
             points = points[0]
-        self.points = list(map(Point.clone, points))
+        self.points = [_Vec(p.x, p.y) for p in points]
         GraphicsObject.__init__(self, ["outline", "width", "fill"])
 
     def __repr__(self):
@@ -706,18 +1700,18 @@ class Polygon(GraphicsObject):
         return other
 
     def getPoints(self):
-        return list(map(Point.clone, self.points))
+        return [p.toPoint() for p in self.points]
 
     def _move(self, dx, dy):
         for p in self.points:
             p.move(dx,dy)
    
     def _draw(self, canvas, options):
-        args = [canvas]
-        for p in self.points:
-            x,y = canvas.toScreen(p.x,p.y)
-            args.append(x)
-            args.append(y)
+        xs,ys = canvas.toScreenMany(array('d', [p.x for p in self.points]),
+                                    array('d', [p.y for p in self.points]))
+        args = [canvas] + [None]*(2*len(self.points))
+        args[1::2] = xs
+        args[2::2] = ys
         args.append(options)
         return GraphWin.create_polygon(*args) 
 
@@ -726,9 +1720,8 @@ class Text(GraphicsObject):
     def __init__(self, p, text):
         GraphicsObject.__init__(self, ["justify","fill","text","font"])
         self.setText(text)
-        self.anchor = p.clone()
+        self.anchor = _Vec(p.x, p.y)
         self.setFill(DEFAULT_CONFIG['outline'])
-        self.setOutline = self.setFill
 
     def __repr__(self):
         return "Text({}, '{}')".format(self.anchor, self.getText())
@@ -753,7 +1746,7 @@ class Text(GraphicsObject):
         return self.config["text"]
             
     def getAnchor(self):
-        return self.anchor.clone()
+        return self.anchor.toPoint()
 
     def setFace(self, face):
         if face in ['helvetica','arial','courier','times roman']:
@@ -776,6 +1769,9 @@ class Text(GraphicsObject):
         else:
             raise GraphicsError(BAD_OPTION)
 
+    def setOutline(self, color):
+        self.setFill(color)
+
     def setTextColor(self, color):
         self.setFill(color)
 
@@ -784,10 +1780,10 @@ class Entry(GraphicsObject):
 
     def __init__(self, p, width):
         GraphicsObject.__init__(self, [])
-        self.anchor = p.clone()
+        self.anchor = _Vec(p.x, p.y)
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = _backend.StringVar(_getRoot())
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -800,8 +1796,8 @@ class Entry(GraphicsObject):
     def _draw(self, canvas, options):
         p = self.anchor
         x,y = canvas.toScreen(p.x,p.y)
-        frm = tk.Frame(canvas.master)
-        self.entry = tk.Entry(frm,
+        frm = _backend.Frame(canvas.master)
+        self.entry = _backend.Entry(frm,
                               width=self.width,
                               textvariable=self.text,
                               bg = self.fill,
@@ -819,12 +1815,12 @@ class Entry(GraphicsObject):
         self.anchor.move(dx,dy)
 
     def getAnchor(self):
-        return self.anchor.clone()
+        return self.anchor.toPoint()
 
     def clone(self):
         other = Entry(self.anchor, self.width)
         other.config = self.config.copy()
-        other.text = tk.StringVar()
+        other.text = _backend.StringVar(_getRoot())
         other.text.set(self.text.get())
         other.fill = self.fill
         return other
@@ -878,14 +1874,14 @@ class Image(GraphicsObject):
     
     def __init__(self, p, *pixmap):
         GraphicsObject.__init__(self, [])
-        self.anchor = p.clone()
+        self.anchor = _Vec(p.x, p.y)
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
         if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+            self.img = _backend.PhotoImage(file=pixmap[0], master=_getRoot())
         else: # width and height provided
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = _backend.PhotoImage(master=_getRoot(), width=width, height=height)
 
     def __repr__(self):
         return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
@@ -907,7 +1903,7 @@ class Image(GraphicsObject):
         GraphicsObject.undraw(self)
 
     def getAnchor(self):
-        return self.anchor.clone()
+        return self.anchor.toPoint()
         
     def clone(self):
         other = Image(Point(0,0), 0, 0)
@@ -943,6 +1939,77 @@ class Image(GraphicsObject):
         
         """
         self.img.put("{" + color +"}", (x, y))
+
+    def getPixels(self, x=0, y=0, width=None, height=None):
+        """Returns the RGB values of a region (the whole image by
+        default) as a bytearray with 3 bytes per pixel, row by row.
+        Only one call is made to Tk for the whole region.
+
+        """
+        if width is None: width = self.getWidth() - x
+        if height is None: height = self.getHeight() - y
+        self._checkRegion(x, y, width, height)
+        if isinstance(self.img, _NullPhoto):
+            return self.img.readRGB(x, y, width, height)
+        rows = self.img.tk.call(self.img.name, "data", "-from", x, y, x+width, y+height)
+        if not isinstance(rows, str):
+            rows = " ".join(rows)
+        # rows is "{#rrggbb #rrggbb ...} {...}", fromhex skips the spaces
+        return bytearray.fromhex(rows.replace("{", "").replace("}", "").replace("#", ""))
+
+    def _checkRegion(self, x, y, width, height):
+        if (x < 0 or y < 0 or width < 0 or height < 0 or
+                x+width > self.getWidth() or y+height > self.getHeight()):
+            raise GraphicsError("the region {}x{} at ({}, {}) is not inside the {}x{} image".format(
+                width, height, x, y, self.getWidth(), self.getHeight()))
+
+    def getPixelArray(self, x=0, y=0, width=None, height=None):
+        """Like getPixels, but returns a NumPy array of shape
+        (height, width, 3)
+
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise GraphicsError("getPixelArray requires numpy")
+        data = self.getPixels(x, y, width, height)
+        if width is None: width = self.getWidth() - x
+        return np.frombuffer(data, dtype=np.uint8).reshape(-1, width, 3)
+
+    def setPixels(self, data, x=0, y=0, width=None):
+        """Sets a region of pixels from RGB values, 3 bytes per pixel row
+        by row, as returned by getPixels. data may be a bytes-like object
+        or a NumPy uint8 array of shape (height, width, 3), which may be a
+        view such as a slice of getPixelArray. The region is width pixels
+        wide (default: to the right edge of the image) and starts at
+        (x,y). It must fit in the image. Only one call is made to Tk.
+
+        """
+        np = _numpy()
+        if np is not None and isinstance(data, np.ndarray):
+            if data.dtype != np.uint8:
+                raise GraphicsError("setPixels needs uint8 values, not " + str(data.dtype))
+            if data.ndim == 3:
+                if data.shape[2] != 3:
+                    raise GraphicsError("setPixels needs arrays of shape (height, width, 3)")
+                width = data.shape[1]
+            data = np.ascontiguousarray(data)
+        data = memoryview(data).cast("B")
+        if width is None: width = self.getWidth() - x
+        if width <= 0 or len(data) % (3*width):
+            raise GraphicsError("{} bytes of pixel data are not whole rows {} pixels wide".format(len(data), width))
+        height = len(data) // (3*width)
+        self._checkRegion(x, y, width, height)
+        if isinstance(self.img, _NullPhoto):
+            self.img.writeRGB(data, x, y, width, height)
+            return
+        hexdata = data.hex()
+        rowLength = 6*width
+        rows = []
+        for row in range(height):
+            line = hexdata[row*rowLength:(row+1)*rowLength]
+            rows.append("{#" + " #".join([line[i:i+6] for i in range(0, rowLength, 6)]) + "}")
+        self.img.put(" ".join(rows), (x, y))
         
 
     def save(self, filename):
@@ -1008,8 +2075,7 @@ def test():
 #MacOS fix 2
 #tk.Toplevel(_root).destroy()
 
-# MacOS fix 1
-update()
+# MacOS fix 1 is done in _getRoot, when the root window is created
 
 if __name__ == "__main__":
     test()
@@ -1,10 +1,18 @@
+import sys
+
 from gamemodel import *
 from graphics import *
+from gameloop import FixedStepLoop
 
 
 class GameGraphics:
-    def __init__(self, game):
+    """ With profile set, fire and explode print the canvas calls and frame times of each animation, see graphics.Profiler.
+    Every shot is recorded in log, a replay.ShotLog, if one is given """
+    def __init__(self, game, profile=False, log=None):
         self.game = game
+        self.log = log
+        if profile:
+            startProfiling()
 
         self.win = GraphWin("Cannon game" , 640, 480, autoflush=False)
         self.win.setCoords(-110, -10, 110, 155)
@@ -13,6 +21,9 @@ class GameGraphics:
         self.draw_cannons = [self.drawCanon(0), self.drawCanon(1)]
         self.draw_scores  = [self.drawScore(0), self.drawScore(1)]
         self.draw_projs   = [None, None]
+        self.loop = None  # the game loop of the last shot, for its frame statistics
+        self.dialog = None
+        self.trails = []
         
 
     def drawCanon(self, playerNr):
@@ -38,8 +49,22 @@ class GameGraphics:
         return text
       
     def fire(self, angle, vel):
+        proj, loop = self.launch(angle, vel)
+        loop.run(lambda: not proj.isMoving())
+        self.reportProfile("fire")
+        return proj
+
+    async def fireAsync(self, angle, vel):
+        proj, loop = self.launch(angle, vel)
+        await loop.runAsync(lambda: not proj.isMoving(), update=self.win.paceFrameAsync)
+        self.reportProfile("fire")
+        return proj
+
+    """ Fire a projectile for the current player and draw it. Returns the projectile and the game loop that animates it """
+    def launch(self, angle, vel):
         player = self.game.getCurrentPlayer()
         proj = player.fire(angle, vel)
+        proj.startTrace(timeStep=1/50)  # the path of the shot is kept in proj.getTrace()
 
         if self.draw_projs[self.game.getCurrentPlayerNumber()] is not None:  
             self.draw_projs[self.game.getCurrentPlayerNumber()].undraw()
@@ -50,66 +75,196 @@ class GameGraphics:
 
         self.draw_projs[self.game.getCurrentPlayerNumber()] = circle
 
-        while proj.isMoving():
-            proj.update(1/50)
-            circle.move(proj.getX() - circle.getCenter().getX(), proj.getY() - circle.getCenter().getY())
-            update(50)
-
-        return proj
+        # Every shot leaves its trail, each one a single canvas item however long the flight
+        trail = Polyline([proj.getX()], [proj.getY()])
+        trail.setFill(player.getColor())
+        trail.draw(self.win)
+        self.trails.append(trail)
+
+        # The physics runs in fixed steps of 1/50 s, the circle is drawn between the last two steps
+        previous = [proj.getX(), proj.getY()]
+        drawn = [proj.getX(), proj.getY()]
+
+        def step(dt):
+            previous[:] = proj.getX(), proj.getY()
+            proj.update(dt)
+
+        def render(alpha):
+            x = previous[0] + alpha * (proj.getX() - previous[0])
+            y = previous[1] + alpha * (proj.getY() - previous[1])
+            self.win.beginFrame()
+            circle.move(x - drawn[0], y - drawn[1])
+            trail.append(x, y)
+            self.win.endFrame()
+            drawn[:] = x, y
+
+        self.loop = FixedStepLoop(step, render, 1/50, 50, update=self.win.paceFrame)
+        return proj, self.loop
     
 
 
+    """ 
+        Animate every projectile in flight in the game (see Game.launch, salvo and fireBoth) until all
+        have landed. The whole set is advanced with a single Game.step per physics step and drawn in
+        one frame. Hits are scored for the player that fired. Returns the landed projectiles as
+        (id, player number, Projectile)
+    """
+    def fireAll(self):
+        circles = {}  # id -> [circle, drawn x, drawn y]
+        landed = []
+
+        def step(dt):
+            for id, playerNr, proj in self.game.step(dt):
+                landed.append((id, playerNr, proj))
+                if id in circles:
+                    circles.pop(id)[0].undraw()
+                self.scoreShot(proj, playerNr)
+
+        def render(alpha):
+            ids, xs, ys = self.game.getFlying().getPositions()
+            owners = self.game.getFlying().owners
+            self.win.beginFrame()
+            for id, playerNr, x, y in zip(ids, owners, xs, ys):
+                self.drawFlying(circles, id, playerNr, x, y)
+            self.win.endFrame()
+
+        self.loop = FixedStepLoop(step, render, 1/50, 50, update=self.win.paceFrame)
+        self.loop.run(lambda: len(self.game.getFlying()) == 0)
+        self.reportProfile("fire")
+        return landed
+
+    def drawFlying(self, circles, id, playerNr, x, y):
+        # Move the circle of projectile id to (x, y), drawing it on its first frame
+        if id not in circles:
+            circle = Circle(Point(x, y), self.game.getBallSize())
+            circle.setFill(self.game.getPlayers()[playerNr].getColor())
+            circle.draw(self.win)
+            circles[id] = [circle, x, y]
+        entry = circles[id]
+        entry[0].move(x - entry[1], y - entry[2])
+        entry[1], entry[2] = x, y
+
     def updateScore(self,playerNr): 
         
-        if self.draw_scores[playerNr] is not None:  
-            self.draw_scores[playerNr].undraw()
-            
         score_text = f"Score: {self.game.getPlayers()[playerNr].getScore()}"
 
-        score_position = Point(self.game.getPlayers()[playerNr].getX(), -4)
-        self.draw_scores[playerNr] = Text(score_position, score_text)
-        self.draw_scores[playerNr].draw(self.win)
+        if self.draw_scores[playerNr] is not None:  
+            self.draw_scores[playerNr].setText(score_text)
+        else:
+            score_position = Point(self.game.getPlayers()[playerNr].getX(), -4)
+            self.draw_scores[playerNr] = Text(score_position, score_text)
+            self.draw_scores[playerNr].draw(self.win)
 
 
     def explode(self, proj,color):
+        for frame in self.explosionFrames(proj, color):
+            self.win.paceFrame(50)
+
+    async def explodeAsync(self, proj,color):
+        for frame in self.explosionFrames(proj, color):
+            await self.win.paceFrameAsync(50)
+
+    # The explosion is a single ring that grows in place, no canvas items are created or deleted per frame.
+    # A generator that yields when a frame is ready to be shown, so explode and explodeAsync share it
+    def explosionFrames(self, proj, color):
         radius=self.game.getBallSize()
+        explosion_ring = self.drawRing(proj, radius, color)
 
         while radius< 2*self.game.getCannonSize() :
-            explosion_ring = Circle(Point(proj.getX(), proj.getY()), radius)
-            explosion_ring.setFill(color)
-            explosion_ring.draw(self.win)
-            update(50)
+            explosion_ring.setRadius(radius)
+            yield
             radius+=1
-            explosion_ring.undraw()
+        explosion_ring.undraw()
+        self.reportProfile("explode")
+
+    """ Print and reset the profile of the animation that just ended, if profiling is on """
+    def reportProfile(self, name):
+        profiler = getProfiler()
+        if profiler is not None:
+            print(name + ": " + profiler.report())
+            if name == "fire":
+                print("  " + self.loop.report())
+            print("  " + self.win.pacer.report())
+            profiler.reset()
+            self.win.pacer.resetStats()
+
+    def drawRing(self, proj, radius, color):
+        ring = Circle(Point(proj.getX(), proj.getY()), radius)
+        ring.setFill(color)
+        ring.draw(self.win)
+        return ring
     
     def play(self):
         while True:
             player = self.game.getCurrentPlayer()
-            oldAngle,oldVel = player.getAim()
-            wind = self.game.getCurrentWind()
 
-            # InputDialog(self, angle, vel, wind) is a class in gamegraphics
-            inp = InputDialog(oldAngle,oldVel,wind)
             # interact(self) is a function inside InputDialog. It runs a loop until the user presses either the quit or fire button
-            if inp.interact() == "Fire!": 
-                angle, vel = inp.getValues()
+            inp = self.inputDialog()
+            if inp.interact() == "Quit":
                 inp.close()
-            elif inp.interact() == "Quit":
                 exit()
+            angle, vel = inp.getValues()
             
-            player = self.game.getCurrentPlayer()
-            other = self.game.getOtherPlayer()
             proj = self.fire(angle, vel)
-            distance = other.projectileDistance(proj)
-
-            if distance == 0.0:
-                player.increaseScore()
-                self.updateScore(self.game.getCurrentPlayerNumber())
+            self.recordShot(proj)
+            if self.scoreShot(proj):
                 self.explode(proj,player.getColor())
                 self.game.newRound()
 
             self.game.nextPlayer()
 
+    """ The input dialog, showing the aim of the current player and the wind. It is created on the first turn and reused after that """
+    def inputDialog(self):
+        oldAngle,oldVel = self.game.getCurrentPlayer().getAim()
+        wind = self.game.getCurrentWind()
+        if self.dialog is None or self.dialog.win.isClosed():
+            self.dialog = InputDialog(oldAngle,oldVel,wind)
+        else:
+            self.dialog.setValues(oldAngle,oldVel,wind)
+        return self.dialog
+
+    """ Same game as play, but as a coroutine: animations and waiting for input let other asyncio tasks
+    (network, bots) run in the same thread. Returns when the player quits """
+    async def playAsync(self):
+        while True:
+            player = self.game.getCurrentPlayer()
+
+            inp = self.inputDialog()
+            if await inp.interactAsync() == "Quit":
+                inp.close()
+                return
+            angle, vel = inp.getValues()
+
+            proj = await self.fireAsync(angle, vel)
+            self.recordShot(proj)
+            if self.scoreShot(proj):
+                await self.explodeAsync(proj,player.getColor())
+                self.game.newRound()
+
+            self.game.nextPlayer()
+
+    """ Check if a projectile fired by player number playerNr (the current player if not given) hit the other player """
+    def isHit(self, proj, playerNr=None):
+        if playerNr is None:
+            playerNr = self.game.getCurrentPlayerNumber()
+        return self.game.getPlayers()[1 - playerNr].projectileDistance(proj) == 0.0
+
+    """ If a projectile fired by player number playerNr (the current player if not given) hit the other player,
+    award the point and show the new score. Returns whether it was a hit """
+    def scoreShot(self, proj, playerNr=None):
+        if playerNr is None:
+            playerNr = self.game.getCurrentPlayerNumber()
+        if not self.isHit(proj, playerNr):
+            return False
+        self.game.getPlayers()[playerNr].increaseScore()
+        self.updateScore(playerNr)
+        return True
+
+    """ Record a shot of the current player in the replay log, if there is one """
+    def recordShot(self, proj):
+        if self.log is not None:
+            self.log.recordShot(self.game, proj)
+
 
 
 
@@ -140,13 +295,31 @@ class InputDialog:
         self.quit = Button(win, Point(3,4), 1.25, .5, "Quit")
         self.quit.activate()
 
+    """ Show new values in the dialog, so it can be reused for the next turn """
+    def setValues(self, angle, vel, wind):
+        self.angle.setText(str(angle))
+        self.vel.setText(str(vel))
+        self.height.setText("{0:.2f}".format(wind))
+
     def interact(self):
         while True:
-            pt = self.win.getMouse()
-            if self.quit.clicked(pt):
-                return "Quit"
-            if self.fire.clicked(pt):
-                return "Fire!"
+            button = self.clickedButton(self.win.getMouse())
+            if button:
+                return button
+
+    async def interactAsync(self):
+        while True:
+            button = self.clickedButton(await self.win.getMouseAsync())
+            if button:
+                return button
+
+    """ The label of the button ("Quit" or "Fire!") at the point clicked, or None """
+    def clickedButton(self, pt):
+        if self.quit.clicked(pt):
+            return "Quit"
+        if self.fire.clicked(pt):
+            return "Fire!"
+        return None
 
     def getValues(self):
         a = float(self.angle.getText())
@@ -193,4 +366,9 @@ class Button:
         self.active = 0
 
 
-GameGraphics(Game(11,3)).play()
+if __name__ == "__main__":
+    log = None
+    if "--record" in sys.argv:
+        from replay import ShotLog
+        log = ShotLog(sys.argv[sys.argv.index("--record") + 1], 11, 3)
+    GameGraphics(Game(11,3), profile="--profile" in sys.argv, log=log).play()
@@ -0,0 +1,144 @@
+import mmap
+import struct
+import sys
+from array import array
+from math import floor
+
+import gamemodel
+
+""" A precomputed table of where shots land. For every quantized (wind, angle, velocity) it
+stores the landing x-position and the time of flight of a shot from the left player (the one
+standing at x=-90), resolved with the same time step as the game drivers. Shots from the right
+player are the mirror image of a left shot in the opposite wind.
+
+The table is a small binary file: a header describing the grid followed by float32 pairs
+(landing x, time of flight), with velocity varying fastest, then angle, then wind. It is
+memory-mapped when loaded, so opening it is cheap no matter how large it is. """
+
+_MAGIC = b"HITT"
+_VERSION = 1
+# magic, version, cannon size, time step and (start, step, count) for wind, angle and velocity
+_HEADER = struct.Struct("<4sIdd" + "ddI"*3)
+
+""" Default grid: wind as drawn by Game.newRound, angles that fire towards the opponent and a generous velocity range """
+WIND_GRID = (-10.0, 0.5, 41)
+ANGLE_GRID = (0.0, 1.0, 91)
+VELOCITY_GRID = (0.0, 1.0, 101)
+
+
+"""
+    Compute a hit table by resolving every shot in the grid and write it to path.
+    Each grid is a tuple (start, step, count). Returns the loaded table.
+"""
+def build(path, cannonSize=10, timeStep=1/50, winds=WIND_GRID, angles=ANGLE_GRID, velocities=VELOCITY_GRID):
+    game = gamemodel.Game(cannonSize, 1)
+    shooter = game.getPlayers()[0]
+
+    data = array("f")
+    for wind in _gridValues(winds):
+        game.setCurrentWind(wind)
+        for angle in _gridValues(angles):
+            for velocity in _gridValues(velocities):
+                proj = shooter.fire(angle, velocity)
+                ticks = proj.resolve(timeStep)
+                data.append(proj.getX())
+                data.append(ticks * timeStep)
+
+    if sys.byteorder != "little":
+        data.byteswap()  # the file is little-endian, like its header
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, cannonSize, timeStep, *(winds + angles + velocities)))
+        data.tofile(f)
+    return HitTable(path)
+
+def _gridValues(grid):
+    start, step, count = grid
+    return [start + i*step for i in range(count)]
+
+
+""" A hit table loaded from a file written by build() """
+class HitTable:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        fields = _HEADER.unpack_from(self._map)
+        if fields[0] != _MAGIC or fields[1] != _VERSION:
+            self._map.close()
+            raise ValueError("{} is not a hit table".format(path))
+        self.cannonSize, self.timeStep = fields[2:4]
+        self.winds, self.angles, self.velocities = fields[4:7], fields[7:10], fields[10:13]
+        self._data = memoryview(self._map)[_HEADER.size:].cast("f")
+        if sys.byteorder != "little":
+            # The file is little-endian, so big-endian hosts read a swapped copy instead of the map
+            data = array("f", self._data)
+            self._data.release()
+            data.byteswap()
+            self._data = data
+
+    """ The number of shots in the table """
+    def __len__(self):
+        return len(self._data) // 2
+
+    """
+        Landing x-position and time of flight for a shot, interpolated between the grid points.
+        Values outside the grid are clamped to its edges. reversed selects the right player.
+        Shots that are stopped by a wall make the landing position jump, so cells next to
+        such shots are only approximate.
+    """
+    def lookup(self, wind, angle, velocity, reversed=False):
+        if reversed:
+            wind = -wind
+        (w0, w1, wt), (a0, a1, at), (v0, v1, vt) = (
+            _cell(self.winds, wind), _cell(self.angles, angle), _cell(self.velocities, velocity))
+
+        nAngle, nVel = self.angles[2], self.velocities[2]
+        data = self._data
+        x = time = 0.0
+        for wi, ww in ((w0, 1-wt), (w1, wt)):
+            for ai, aw in ((a0, 1-at), (a1, at)):
+                for vi, vw in ((v0, 1-vt), (v1, vt)):
+                    weight = ww*aw*vw
+                    if weight:
+                        i = 2*((wi*nAngle + ai)*nVel + vi)
+                        x += weight*data[i]
+                        time += weight*data[i+1]
+
+        if reversed:
+            x = -x
+        return x, time
+
+    """ Landing x-position and time of flight for a shot by player, with the current wind of its game """
+    def lookupShot(self, player, angle, velocity):
+        return self.lookup(player.game.getCurrentWind(), angle, velocity, player.isReversed)
+
+    """
+        The table as a read-only NumPy array of shape (winds, angles, velocities, 2), without copying.
+        The array points into the file, so it must be dropped before the table is closed.
+    """
+    def asarray(self):
+        np = gamemodel._numpy()
+        if np is None:
+            raise ImportError("HitTable.asarray requires numpy")
+        return np.frombuffer(self._map, dtype="<f4", offset=_HEADER.size).reshape(
+            self.winds[2], self.angles[2], self.velocities[2], 2)
+
+    """ Close the file. Raises BufferError, leaving the table open, while arrays from asarray() are alive. Closing twice does nothing """
+    def close(self):
+        if self._map.closed:
+            return
+        if isinstance(self._data, memoryview):
+            self._data.release()
+        try:
+            self._map.close()
+        except BufferError:
+            if isinstance(self._data, memoryview):
+                self._data = memoryview(self._map)[_HEADER.size:].cast("f")
+            raise BufferError("the hit table is still used by arrays from asarray(), drop them before closing it") from None
+
+def _cell(grid, value):
+    # The two grid indices around value and the interpolation weight of the upper one
+    start, step, count = grid
+    pos = min(max((value - start) / step, 0), count - 1)
+    low = min(int(floor(pos)), count - 2) if count > 1 else 0
+    return low, min(low + 1, count - 1), pos - low
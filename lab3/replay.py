@@ -0,0 +1,144 @@
+import os
+import struct
+import sys
+
+import gamemodel
+
+""" Recording and replaying games. A replay log is a small append-only binary file: a header
+with the cannon and ball size of the game, followed by one fixed-size record per shot with the
+inputs of the shot (player, angle, velocity and wind) and the resulting distance to the
+opponent. A replay fires every shot again, stepping the projectile exactly like the game drivers
+do, so distances and scores come out bit-for-bit the same as in the recorded game. """
+
+_MAGIC = b"RPLY"
+_VERSION = 1
+# magic, version, cannon size, ball size
+_HEADER = struct.Struct("<4sIdd")
+# player number, angle, velocity, wind, distance to the opponent
+_RECORD = struct.Struct("<Bdddd")
+
+""" The time step of the game drivers, shots are replayed with the same steps """
+TIME_STEP = 1/50
+
+
+"""
+    Appends the shots of a game to a replay log. An existing log is continued if it is for the same
+    game settings. A record cut short at its end, by a crash while it was written, is dropped first
+"""
+class ShotLog:
+    def __init__(self, path, cannonSize, ballSize):
+        self.path = path
+        self.file = open(path, "ab")
+        size = self.file.tell()
+        if size == 0:
+            self.file.write(_HEADER.pack(_MAGIC, _VERSION, cannonSize, ballSize))
+            self.file.flush()
+            return
+        try:
+            header = readHeader(path)
+        except ValueError:
+            self.file.close()
+            raise
+        if header != (cannonSize, ballSize):
+            self.file.close()
+            raise ValueError("{} is a replay log for other game settings".format(path))
+        # Appending behind a partial record would shift every later record
+        complete = _HEADER.size + (size - _HEADER.size) // _RECORD.size * _RECORD.size
+        if complete != size:
+            self.file.truncate(complete)
+
+    """ Record a shot. Each record is written straight to the file, so a crash loses at most the shot in progress """
+    def record(self, player, angle, velocity, wind, distance):
+        self.file.write(_RECORD.pack(player, angle, velocity, wind, distance))
+        self.file.flush()
+
+    """ Record the shot proj just fired by the current player of game, before the game moves on to the next player """
+    def recordShot(self, game, proj):
+        angle, velocity = game.getCurrentPlayer().getAim()
+        self.record(game.getCurrentPlayerNumber(), angle, velocity, game.getCurrentWind(),
+                    game.getOtherPlayer().projectileDistance(proj))
+
+    def close(self):
+        self.file.close()
+
+
+""" The cannon size and ball size of the game in a replay log """
+def readHeader(path):
+    with open(path, "rb") as f:
+        return _unpackHeader(f.read(_HEADER.size), path)
+
+def _unpackHeader(data, path):
+    if len(data) < _HEADER.size:
+        raise ValueError("{} is not a replay log".format(path))
+    magic, version, cannonSize, ballSize = _HEADER.unpack(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("{} is not a replay log".format(path))
+    return cannonSize, ballSize
+
+"""
+    Read a replay log. Returns the cannon size, the ball size and a list of shots, each a tuple
+    (player, angle, velocity, wind, distance). A record cut short at the end of the file, by a
+    crash while it was written, is ignored.
+"""
+def readLog(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    cannonSize, ballSize = _unpackHeader(data[:_HEADER.size], path)
+    end = _HEADER.size + (len(data) - _HEADER.size) // _RECORD.size * _RECORD.size
+    return cannonSize, ballSize, list(_RECORD.iter_unpack(data[_HEADER.size:end]))
+
+
+"""
+    Replay the game in a replay log. Every shot is fired again with the recorded wind and
+    stepped like the game drivers do, without drawing (as fast as possible) unless animate is
+    set, in which case the game is shown with GameGraphics.
+    Returns a dict with the number of shots, the final scores and the mismatches: a list of
+    (shot number, recorded distance, replayed distance) for shots that did not reproduce.
+"""
+def replay(path, animate=False):
+    cannonSize, ballSize, shots = readLog(path)
+    game = gamemodel.Game(cannonSize, ballSize, 0)  # the wind is set from the log
+    graphics = None
+    if animate:
+        from graphicsmain import GameGraphics
+        graphics = GameGraphics(game)
+
+    mismatches = []
+    for i, (player, angle, velocity, wind, distance) in enumerate(shots):
+        if player != game.getCurrentPlayerNumber():
+            raise ValueError("shot {} in {} is out of turn".format(i, path))
+        game.setCurrentWind(wind)
+
+        if graphics is not None:
+            proj = graphics.fire(angle, velocity)
+        else:
+            proj = game.getCurrentPlayer().fire(angle, velocity)
+            while proj.isMoving():
+                proj.update(TIME_STEP)
+
+        replayed = game.getOtherPlayer().projectileDistance(proj)
+        if replayed != distance:
+            mismatches.append((i, distance, replayed))
+
+        if replayed == 0.0:
+            if graphics is not None:
+                graphics.scoreShot(proj)
+                graphics.explode(proj, game.getCurrentPlayer().getColor())
+            else:
+                game.getCurrentPlayer().increaseScore()
+            game.newRound()
+        game.nextPlayer()
+
+    return {"shots": len(shots), "scores": [p.getScore() for p in game.getPlayers()],
+            "mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    animate = "--animate" in sys.argv
+    failed = 0
+    for path in [arg for arg in sys.argv[1:] if arg != "--animate"]:
+        result = replay(path, animate)
+        status = "ok" if not result["mismatches"] else "{} mismatches".format(len(result["mismatches"]))
+        print("{0}: {1} shots, score {2[0]}-{2[1]}, {3}".format(os.path.basename(path), result["shots"], result["scores"], status))
+        failed += bool(result["mismatches"])
+    sys.exit(1 if failed else 0)
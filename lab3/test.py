@@ -1,6 +1,7 @@
 import io
 import sys
 import importlib.util
+from math import cos,radians
 
 def test(res,msg):
     global pass_tests, fail_tests
@@ -119,6 +120,570 @@ def runTests(game):
     if (playerAtts > 8):
         print("Your Player object has {} attributes. This isn't necessarily wrong, but it seems a bit high.".format(playerAtts))
 
+def runResolveTests(game):
+    players = game.getPlayers()
+    game.setCurrentWind(0)
+
+    proj = players[0].fire(30,31)
+    proj.update(1.0)
+    ticks = proj.resolve(0.1)
+    test(ticks == 25, "resolve() should give the same tick-count as stepping, got {}".format(ticks))
+    test(proj.getY() == 0.0, "resolved projectile should stop at y=0")
+    test(abs(proj.getX() - 3.9637563106115907) < 0.01, "Resolved X-Position is {0:f}, should be 3.9637563106115907".format(proj.getX()))
+    test(proj.resolve(0.1) == 0, "resolving a stopped projectile should take no ticks")
+
+    proj = players[1].fire(45,41)
+    test(players[1].getX() - proj.getX() == 0, "Fired projectile should start at player X-position")
+    test(abs(proj.apex()[1] - (5 + 41**2/4/9.8)) < 0.01, "apex() gives the wrong height")
+    test(abs(proj.landingTime() - 6.084319) < 0.01, "landingTime() is {0:f}, should be 6.084319".format(proj.landingTime()))
+    test(proj.wallTime() > proj.landingTime(), "projectile should land before it reaches the wall")
+    ticks = proj.resolve(0.1)
+    test(ticks == 61, "resolve() should give the same tick-count as stepping, got {}".format(ticks))
+    test(abs(proj.getX() - -86.84740597475547) < 0.01, "Resolved X-Position is {0:f}, should be -86.84740597475547".format(proj.getX()))
+
+    game.setCurrentWind(-1)
+    proj = players[0].fire(45,41)
+    test(proj.resolve(0.1) == 61, "resolve() should take wind into account")
+    test(abs(proj.getX() - 68.2424059747553) < 0.01, "Resolved X-Position is {0:f}, should be 68.2424059747553".format(proj.getX()))
+
+    game.setCurrentWind(0)
+    proj = players[0].fire(10,100)
+    test(abs(proj.wallTime() - 200/(100*cos(radians(10)))) < 0.01, "wallTime() gives the wrong time")
+    proj.resolve(1/50)
+    test(proj.getX() == 110, "projectile should stop at the wall")
+
+def runAimTests(game):
+    players = game.getPlayers()
+    for wind in [-7.5, 0, 4]:
+        game.setCurrentWind(wind)
+        for player, other in [(players[0], players[1]), (players[1], players[0])]:
+            aims = player.solveAim()
+            test(len(aims) > 0, "solveAim() should find a hit with wind {}".format(wind))
+            for angle, vel in aims:
+                proj = player.fire(angle, vel)
+                while proj.isMoving():
+                    proj.update(1/50)
+                test(other.projectileDistance(proj) == 0, "aim ({0:.1f}, {1:.1f}) should hit with wind {2}".format(angle, vel, wind))
+
+    # Winds between the steps of the solution cache
+    for wind in [4.37, -2.04, 9.96, -6.651]:
+        game.setCurrentWind(wind)
+        for player, other in [(players[0], players[1]), (players[1], players[0])]:
+            for angle, vel in player.solveAim():
+                proj = player.fire(angle, vel)
+                while proj.isMoving():
+                    proj.update(1/50)
+                test(other.projectileDistance(proj) == 0, "aim ({0:.1f}, {1:.1f}) should hit with wind {2}".format(angle, vel, wind))
+        angle, vel = players[0].aimAt(0)
+        proj = players[0].fire(angle, vel)
+        proj.resolve(1/50)
+        test(abs(proj.getX()) < 1, "aimAt(0) should land close to 0 with wind {0}, landed at {1:f}".format(wind, proj.getX()))
+
+    game.setCurrentWind(0)
+    angle, vel = players[0].aimAt(0)
+    proj = players[0].fire(angle, vel)
+    proj.resolve(1/50)
+    test(abs(proj.getX()) < 1, "aimAt(0) should land close to 0, landed at {0:f}".format(proj.getX()))
+
+def runBatchTests(gamemodel):
+    angles = [30, 135, 45]
+    velocities = [31, 41, 41]
+    winds = [0, 0, -1]
+    starts = [-90, 90, -90]
+    batch = gamemodel.ProjectileBatch(angles, velocities, winds, starts, 10/2, -110, 110)
+    test(len(batch) == 3, "batch should hold three projectiles")
+    test(batch.isMoving().all(), "all projectiles in the batch should be moving")
+
+    ticks = batch.run(0.1)
+    test(not batch.isMoving().any(), "all projectiles in the batch should have stopped")
+    for i in range(3):
+        proj = gamemodel.Projectile(angles[i], velocities[i], winds[i], starts[i], 10/2, -110, 110)
+        count = 0
+        while proj.isMoving():
+            proj.update(0.1)
+            count += 1
+        test(ticks[i] == count, "batch tick-count {} should be {}".format(ticks[i], count))
+        test(batch.getX()[i] == proj.getX(), "batch X-Position is {0:f}, should be {1:f}".format(batch.getX()[i], proj.getX()))
+        test(batch.getY()[i] == 0.0, "batch projectiles should stop at y=0")
+
+def runWindTests(gamemodel):
+    import random
+    winds = [gamemodel.Game(10,3,7).newRound() for i in range(2)]
+    test(winds[0] == winds[1], "games with the same seed should have the same wind")
+
+    first, second = gamemodel.Game(10,3,random.Random(7)), gamemodel.Game(10,3,7)
+    drawn = [first.newRound() for i in range(5)]
+    test(second.predrawWinds(5) == drawn, "predrawn winds should be the same as winds drawn one by one")
+    test([second.newRound() for i in range(5)] == drawn, "newRound should use the predrawn winds")
+    test(all(-10 <= wind <= 10 for wind in drawn), "seeded wind should be a value in [-10,10]")
+
+    game = gamemodel.Game(10,3,[1, -2.5, 3])
+    test(game.getCurrentWind() == 1, "a wind schedule should give the first wind")
+    test([game.newRound(), game.newRound()] == [-2.5, 3], "newRound should follow the wind schedule")
+    try:
+        game.newRound()
+        test(False, "a wind schedule that has run out should raise ValueError")
+    except ValueError:
+        pass
+
+    test(gamemodel.shardSeed(1, 2) == gamemodel.shardSeed(1, 2), "shard seeds should be reproducible")
+    test(gamemodel.shardSeed(1, 2) != gamemodel.shardSeed(1, 3), "different shards should get different seeds")
+
+    if gamemodel._numpy() is not None:
+        seq = [gamemodel.Game(10,3,gamemodel._numpy().random.default_rng(3)) for i in range(2)]
+        test(seq[0].predrawWinds(100) == [seq[1].newRound() for i in range(100)],
+             "numpy generators should give the same wind predrawn or one by one")
+        seeded = gamemodel.Game(10,3,gamemodel._numpy().int64(3))
+        test(seeded.predrawWinds(10) == gamemodel.Game(10,3,3).predrawWinds(10), "a numpy integer seed should work like an int seed")
+
+def runTraceTests(gamemodel):
+    proj = gamemodel.Projectile(45, 40, 0, -90, 10/2, -110, 110)
+    trace = proj.startTrace()
+    for i in range(25):
+        proj.update(0.1)
+    samples = trace.getSamples()
+    test(len(trace) == 26, "trace should hold the start and 25 samples, holds {}".format(len(trace)))
+    test(samples[0] == (0.0, -90, 5.0), "trace should start at the initial position")
+    test(samples[-1][1:] == (proj.getX(), proj.getY()), "trace should end at the current position")
+
+    small = gamemodel.Projectile(45, 40, 0, -90, 10/2, -110, 110)
+    small.startTrace(10)
+    for i in range(25):
+        small.update(0.1)
+    test(small.getTrace().getSamples() == samples[-10:], "a full trace should keep the latest samples")
+    test(trace.downsample(10).getSamples() == [samples[0], samples[10], samples[20], samples[25]],
+         "downsampled trace should keep every 10th and the last sample")
+
+    stepped = gamemodel.Projectile(60, 35, 1, -90, 10/2, -110, 110)
+    resolved = gamemodel.Projectile(60, 35, 1, -90, 10/2, -110, 110)
+    stepped.startTrace(timeStep=1/50)
+    resolved.startTrace(timeStep=1/50)
+    while stepped.isMoving():
+        stepped.update(1/50)
+    resolved.resolve(1/50)
+    a, b = stepped.getTrace().getSamples(), resolved.getTrace().getSamples()
+    test(len(a) == len(b) and max(abs(p - q) for s, r in zip(a, b) for p, q in zip(s, r)) < 1e-9,
+         "resolve should trace the same path as stepping")
+    test(len(a) == stepped.getTrace().count and len(a) <= stepped.getTrace().capacity <= len(a) + 2,
+         "a trace sized by the time step should fit the whole flight, {} samples in {}".format(len(a), stepped.getTrace().capacity))
+
+    if gamemodel._numpy() is not None:
+        import os, tempfile
+        path = os.path.join(tempfile.mkdtemp(), "trace.npy")
+        trace.save(path)
+        loaded = gamemodel._numpy().load(path)
+        os.remove(path)
+        test(loaded.shape == (26, 3) and (loaded == trace.asarray()).all(), "saved trace should load with numpy")
+
+def runFlyingTests(gamemodel, batched):
+    game = gamemodel.Game(10, 3, 1)
+    test((game.getFlying(batched).batch is not None) == batched, "the projectiles in flight should be batched as asked")
+    game.setCurrentWind(0.5)
+    ids = game.salvo([30, 45, 60], 40)
+    test(ids == [0, 1, 2], "salvo should return the ids of its projectiles")
+    test(game.getCurrentPlayer().getAim() == (45, 40), "salvo should not change the aim")
+    try:
+        game.salvo([10, 20, 30], [40, 50])
+        test(False, "salvo with angles and velocities of different lengths should raise ValueError")
+    except ValueError:
+        pass
+    both = game.fireBoth((45, 30), (60, 35))
+    test(len(game.getFlying()) == 5, "five projectiles should be in flight")
+
+    landed = {}
+    steps = 0
+    while len(game.getFlying()) > 0 and steps < 1000:
+        for id, playerNr, proj in game.step(1/50):
+            landed[id] = (playerNr, proj, steps)
+        steps += 1
+    test(sorted(landed) == ids + both, "every projectile should land once")
+    test([landed[id][0] for id in both] == [0, 1], "fireBoth should fire one projectile for each player")
+
+    shots = [(0, 30, 40), (0, 45, 40), (0, 60, 40), (0, 45, 30), (1, 60, 35)]
+    for id, (playerNr, angle, vel) in enumerate(shots):
+        proj = game.getPlayers()[playerNr]._projectile(angle, vel, 0.5)
+        ticks = 0
+        while proj.isMoving():
+            proj.update(1/50)
+            ticks += 1
+        test(landed[id][1].getX() == proj.getX() and landed[id][2] == ticks - 1,
+             "projectile {} should land as if fired alone".format(id))
+
+def runReplayTests():
+    import os, random, tempfile
+    import gamemodel, replay
+    path = os.path.join(tempfile.mkdtemp(), "game.replay")
+    log = replay.ShotLog(path, 10, 3)
+    game = gamemodel.Game(10, 3, 5)
+    rng = random.Random(5)
+    for i in range(40):
+        player = game.getCurrentPlayer()
+        aims = player.solveAim()
+        angle, vel = rng.choice(aims) if aims and rng.random() < 0.3 else (rng.uniform(20, 70), rng.uniform(20, 60))
+        proj = player.fire(angle, vel)
+        while proj.isMoving():
+            proj.update(1/50)
+        log.recordShot(game, proj)
+        if game.getOtherPlayer().projectileDistance(proj) == 0.0:
+            player.increaseScore()
+            game.newRound()
+        game.nextPlayer()
+    log.close()
+
+    result = replay.replay(path)
+    scores = [p.getScore() for p in game.getPlayers()]
+    test(result["shots"] == 40, "replay should have 40 shots, has {}".format(result["shots"]))
+    test(result["mismatches"] == [], "replayed distances should match the log exactly")
+    test(result["scores"] == scores, "replayed scores {} should be {}".format(result["scores"], scores))
+
+    with open(path, "ab") as f:
+        f.write(b"partial")
+    test(len(replay.readLog(path)[2]) == 40, "a record cut short should be ignored")
+
+    log = replay.ShotLog(path, 10, 3)
+    log.record(1, 45.0, 40.0, 1.5, -3.0)
+    log.close()
+    shots = replay.readLog(path)[2]
+    test(len(shots) == 41 and shots[-1] == (1, 45.0, 40.0, 1.5, -3.0),
+         "a log continued after a record cut short should read back the new record")
+
+    cannonSize, ballSize, shots = replay.readLog(path)
+    os.remove(path)
+    log = replay.ShotLog(path, 10, 3)
+    for shot in shots[:3]:
+        log.record(*shot[:4], shot[4] + 1)
+    log.close()
+    test(len(replay.replay(path)["mismatches"]) == 3, "replay should report shots that do not match")
+    try:
+        replay.ShotLog(path, 11, 3)
+        test(False, "continuing a replay log for other game settings should raise ValueError")
+    except ValueError:
+        pass
+    os.remove(path)
+
+def runHitTableTests():
+    import os, tempfile
+    import gamemodel, hittable
+    path = os.path.join(tempfile.mkdtemp(), "small.hits")
+    table = hittable.build(path, 10, 1/50, winds=(-2.0, 1.0, 5), angles=(30.0, 5.0, 5), velocities=(30.0, 5.0, 5))
+    test(len(table) == 5*5*5, "hit table should hold 125 shots, holds {}".format(len(table)))
+
+    game = gamemodel.Game(10, 3, 0)
+    for wind, angle, vel in [(-2, 30, 30), (1, 45, 40), (2, 50, 50), (-1, 35, 45)]:
+        game.setCurrentWind(wind)
+        for player in game.getPlayers():
+            proj = player._projectile(angle, vel, wind)
+            ticks = proj.resolve(1/50)
+            x, time = table.lookupShot(player, angle, vel)
+            test(abs(x - proj.getX()) < 1e-3 and abs(time - ticks/50) < 1e-4,
+                 "hit table lookup ({0:.3f}, {1:.3f}) should be ({2:.3f}, {3:.3f})".format(x, time, proj.getX(), ticks/50))
+    x, time = table.lookup(0.5, 42.5, 37.5)
+    low, high = sorted([table.lookup(0, 40, 35)[0], table.lookup(1, 45, 40)[0]])
+    test(low <= x <= high, "a lookup between grid points should interpolate between them")
+    test(table.lookup(1, 45, 40, True)[0] == -table.lookup(-1, 45, 40)[0], "the right player should mirror the left one")
+    if gamemodel._numpy() is not None:
+        view = table.asarray()
+        test(view.shape == (5, 5, 5, 2) and view[1, 3, 2, 0] == table.lookup(-1, 45, 40)[0], "asarray should show the table")
+        try:
+            table.close()
+            test(False, "closing a hit table still used by an array should raise BufferError")
+        except BufferError:
+            pass
+        test(table.lookup(1, 45, 40) == table.lookup(1.0, 45.0, 40.0), "a hit table that failed to close should stay usable")
+        del view
+    table.close()
+    table.close()
+
+    with open(path, "r+b") as f:
+        f.write(b"JUNK")
+    try:
+        hittable.HitTable(path)
+        test(False, "a file that is not a hit table should raise ValueError")
+    except ValueError:
+        pass
+    os.remove(path)
+
+def runLoopTests():
+    import gamemodel
+    from gameloop import FixedStepLoop
+
+    stepped = gamemodel.Projectile(50, 40, 1.5, -90, 10/2, -110, 110)
+    ticks = 0
+    while stepped.isMoving():
+        stepped.update(1/50)
+        ticks += 1
+
+    # However slow the frames, the physics takes the same steps of 1/50 s
+    for frameTime in [0.02, 0.07, 0.3]:
+        now = [0.0]
+        def update(rate):
+            now[0] += frameTime
+        proj = gamemodel.Projectile(50, 40, 1.5, -90, 10/2, -110, 110)
+        loop = FixedStepLoop(proj.update, lambda alpha: None, 1/50, 50, update=update, clock=lambda: now[0])
+        for run in range(2):
+            if run:
+                proj = gamemodel.Projectile(50, 40, 1.5, -90, 10/2, -110, 110)
+                loop.step = proj.update
+            loop.run(lambda: not proj.isMoving())
+            test(proj.getX() == stepped.getX(), "frames of {0} s should land at {1:f}, landed at {2:f}".format(frameTime, stepped.getX(), proj.getX()))
+            test(loop.stats()["steps"] == ticks, "frames of {0} s should take {1} steps, took {2}".format(frameTime, ticks, loop.stats()["steps"]))
+        test(frameTime < 0.1 or loop.stats()["dropped"] > 0, "frames longer than maxSteps steps should drop time")
+
+""" A window of the record backend, which logs every canvas call in win.log. None if another backend is in use """
+def runBackendTests():
+    import os, subprocess, sys
+    env = dict(os.environ, GRAPHICS_BACKEND="headless")
+    result = subprocess.run([sys.executable, "-c", "import graphics"], env=env, capture_output=True, text=True)
+    test("GraphicsError: unknown backend 'headless'" in result.stderr,
+         "an unknown GRAPHICS_BACKEND should raise GraphicsError, got " + result.stderr.strip().split("\n")[-1])
+
+def recordingWindow():
+    import graphics
+    if graphics.getBackend() != "record":
+        if graphics.GraphWin.windowCount:
+            return None
+        graphics.setBackend("record")
+    win = graphics.GraphWin("test", 200, 200, autoflush=False)
+    win.setCoords(0, 0, 100, 100)
+    return win
+
+def runFrameTests():
+    from graphics import Circle, Point
+    win = recordingWindow()
+    if win is None:
+        return
+    circles = [Circle(Point(10*i, 50), 3).draw(win) for i in range(5)]
+    del win.log[:]
+
+    win.beginFrame()
+    for step in range(10):
+        for c in circles[:3]:
+            c.move(1, 0)
+    circles[0].setFill("red")
+    circles[0].setOutline("blue")
+    test(win.log == [], "nothing should reach the canvas inside a frame")
+    win.endFrame()
+    calls = [(call[0], call[1]) for call in win.log]
+    test(sorted(calls) == sorted([("move", c.id) for c in circles[:3]] + [("itemconfig", circles[0].id)]),
+         "a frame should send one move per moved object and one itemconfig per reconfigured object, sent {}".format(calls))
+    dx = 10 / win.trans.xscale
+    test(all(abs(call[2] - dx) < 1e-9 and call[3] == 0 for call in win.log if call[0] == "move"),
+         "the moves of a frame should be summed")
+    test(win.itemcget(circles[0].id, "outline") == "blue", "the last option set in a frame should win")
+
+def runExplosionTests():
+    from graphics import Circle, Point
+    win = recordingWindow()
+    if win is None:
+        return
+    ring = Circle(Point(50, 50), 3).draw(win)
+    del win.log[:]
+    for radius in range(4, 10):
+        ring.setRadius(radius)
+    test([call[0] for call in win.log] == ["coords"]*6, "setRadius should only reshape the drawn circle, sent {}".format(win.log))
+    test(win.coords(ring.id) == list(ring._screenCoords(win)), "the circle should have its new size on the canvas")
+
+    import graphicsmain, gamemodel
+    graphics = graphicsmain.GameGraphics(gamemodel.Game(10, 3, 0))
+    proj = graphics.game.getPlayers()[0].fire(45, 40)
+    proj.resolve(1/50)
+    del graphics.win.log[:]
+    frames = len(list(graphics.explosionFrames(proj, "red")))
+    calls = [call[0] for call in graphics.win.log]
+    test(calls.count("create_oval") == 1 and calls.count("delete") == 1,
+         "an explosion should create and delete its ring once, not per frame")
+    test(calls.count("coords") == frames, "an explosion should resize its ring once per frame")
+    graphics.win.close()
+
+def runPointCloudTests():
+    import base64, zlib
+    import graphics
+    win = recordingWindow()
+    if win is None:
+        return
+    cloud = graphics.PointCloud([10, 20, 30], [10, 20, 30], "red").draw(win)
+    cloud.setFill("#0000ff")
+    cloud.extend([40, 50], [40, 50])
+    for x, y, color in [(10, 10, (255, 0, 0)), (30, 30, (255, 0, 0)), (50, 50, (0, 0, 255))]:
+        sx, sy = win.toScreen(x, y)
+        test(cloud.img.get(sx, sy) == color, "point cloud pixel at ({}, {}) should be {}".format(x, y, color))
+
+    # The region sent to Tk is a PNG with alpha: unset pixels are transparent
+    png = base64.b64decode(graphics._pngRegion(cloud.rgba, win.getWidth(), 0, 0, win.getWidth(), win.getHeight()))
+    test(png[:8] == b"\x89PNG\r\n\x1a\n", "the point cloud region should be a PNG")
+    rows = zlib.decompress(png[8+8+13+4+8:-12-4])
+    stride = 1 + 4*win.getWidth()
+    sx, sy = win.toScreen(10, 10)
+    test(rows[sy*stride + 1 + 4*sx:sy*stride + 5 + 4*sx] == bytes([255, 0, 0, 255]), "a point should be opaque in the PNG")
+    test(rows[1:5] == bytes(4), "pixels without points should be transparent in the PNG")
+    cloud.undraw()
+
+def runTransformTests():
+    from array import array
+    import graphics
+    win = recordingWindow()
+    if win is None:
+        return
+    # off the window on every side, and screen values just either side of zero
+    xs = [-250.3, -7.3, -0.6, -0.2, 0, 33.3, 99.9, 100.2, 412.7]
+    ys = [412.7, 100.2, 100.6, 99.9, 50, 0.3, -0.2, -7.3, -250.3]
+    screen = [win.toScreen(x, y) for x, y in zip(xs, ys)]
+    inputs = [(xs, ys), (array('d', xs), array('d', ys))]
+    np = graphics._numpy()
+    if np is not None:
+        inputs.append((np.array(xs), np.array(ys)))
+    for x, y in inputs:
+        sx, sy = win.toScreenMany(x, y)
+        test(list(zip(sx, sy)) == screen, "toScreenMany of a {} should match toScreen, got {}".format(
+            type(x).__name__, list(zip(sx, sy))))
+        wx, wy = win.toWorldMany(sx, sy)
+        world = [win.toWorld(*p) for p in screen]
+        test(all(abs(a - p[0]) < 1e-9 and abs(b - p[1]) < 1e-9 for a, b, p in zip(wx, wy, world)),
+             "toWorldMany of a {} should match toWorld".format(type(sx).__name__))
+
+def runProfilerTests():
+    import graphics
+    from graphics import Circle, Point, Line
+    win = recordingWindow()
+    if win is None:
+        return
+    profiler = graphics.startProfiling()
+    circles = [Circle(Point(10*i, 50), 3).draw(win) for i in range(3)]
+    line = Line(Point(0, 0), Point(50, 50)).draw(win)
+    for c in circles:
+        c.move(1, 0)
+    circles[0].move(0, 1)
+    line.undraw()
+    test(graphics.stopProfiling() is profiler, "stopProfiling should return the active profiler")
+    counted = {name: n for name, n in profiler.calls.items() if n}
+    test(counted == {"create_oval": 3, "create_line": 1, "move": 4, "delete": 1},
+         "the profiler should count each canvas call, counted {}".format(counted))
+    test(graphics.getProfiler() is None, "no profiler should be active after stopProfiling")
+    test(all(getattr(graphics.GraphWin, name) is getattr(graphics._NullCanvas, name)
+             for name in graphics.PROFILED_CALLS), "stopProfiling should restore the canvas methods")
+    circles[1].move(1, 0)
+    test(profiler.calls["move"] == 4, "calls after stopProfiling should not be counted")
+
+    # frames 3, 5 and 60 ms apart, with 2 ms buckets; the first frame has no interval
+    profiler = graphics.Profiler(bucket=0.002, buckets=10)
+    for end in [1.0, 1.003, 1.008, 1.068]:
+        profiler.frame(end - 0.001, 0.0, end - 0.001, end)
+    test(profiler.histogram() == [0, 1, 1, 0, 0, 0, 0, 0, 0, 1],
+         "frame intervals should go in their buckets, the last one taking the rest, got {}".format(profiler.histogram()))
+    test(profiler.histogram("tk") == [4] + [0]*9, "every frame spent 1 ms in tk")
+    for c in circles:
+        c.undraw()
+
+def runPacerTests():
+    import graphics
+    now = [0.0]
+    def sleep(seconds):
+        now[0] += seconds
+    pacer = graphics.Pacer(maxLag=0.1, clock=lambda: now[0], sleep=sleep)
+    deadlines = []
+    # The second frame takes 30 ms at 50 frames per second, so the third starts 10 ms late
+    for work in [0.005, 0.03, 0.005, 0.005]:
+        deadlines.append(pacer.wait(50))
+        now[0] += work
+    test(all(abs(d - 0.02*i) < 1e-9 for i, d in enumerate(deadlines)),
+         "a late frame should not move the later deadlines, got {}".format(deadlines))
+    test(abs(now[0] - 0.065) < 1e-9, "the frame after a late one should only wait for its own deadline")
+    stats = pacer.stats()
+    test(stats["frames"] == 4 and abs(stats["max"] - 0.01) < 1e-9 and stats["resyncs"] == 0,
+         "the late frame should show in the stats, got {}".format(stats))
+
+    now[0] += 0.5
+    resumed = now[0]
+    test(pacer.wait(50) == resumed and pacer.stats()["resyncs"] == 1,
+         "a pacer more than maxLag behind should start over from now")
+    test(abs(pacer.wait(50) - (resumed + 0.02)) < 1e-9, "frames should be paced from where the pacer started over")
+    test(pacer.stats()["resyncs"] == 1, "a pacer that started over should not resync again")
+
+def runInputTests():
+    import graphics
+    win = recordingWindow()
+    if win is None:
+        return
+    test(win.getMouse(timeout=0.01) is None, "getMouse should return None after its timeout")
+    test(win.getKey(timeout=0.01) == "", "getKey should return an empty string after its timeout")
+    try:
+        win.getMouse()
+        test(False, "getMouse without a timeout should raise GraphicsError on the {} backend".format(graphics.getBackend()))
+    except graphics.GraphicsError:
+        pass
+    test(win.timers == [], "a timeout should not leave its timer behind")
+    win.close()
+
+def runAsyncInputTests():
+    import asyncio
+    import graphics
+    win = recordingWindow()
+    if win is None:
+        return
+    async def wait():
+        point = await win.getMouseAsync(timeout=0.01)
+        key = await win.getKeyAsync(timeout=0.01)
+        await asyncio.sleep(3*graphics.PUMP_INTERVAL)
+        return point, key, graphics._pumpTask.done()
+    point, key, stopped = asyncio.run(wait())
+    test(point is None and key == "", "getMouseAsync and getKeyAsync should give up after their timeout")
+    test(stopped and win.inputWaiters == [], "the event pump should stop when nothing waits for input")
+    win.close()
+
+def runPixelTests():
+    import graphics
+    if recordingWindow() is None:
+        return
+    img = graphics.Image(graphics.Point(0, 0), 4, 3)
+    data = bytearray(range(3*4*3))
+    img.setPixels(data)
+    test(img.getPixels() == data, "getPixels should return what setPixels wrote")
+    test(img.getPixel(1, 2) == list(data[3*9:3*10]), "setPixels should write row by row")
+    img.setPixels(b"\xff"*3*2*2, 1, 1, 2)
+    test(img.getPixels(1, 1, 2, 2) == bytearray(b"\xff"*12) and img.getPixels(0, 1, 1, 1) == data[12:15],
+         "a region write should only change the region")
+
+    for bad in [lambda: img.getPixels(2, 0, 3, 1), lambda: img.setPixels(bytes(3*4*4)),
+                lambda: img.setPixels(bytes(5)), lambda: img.setPixels(bytes(12), 3, 0, 2)]:
+        try:
+            bad()
+            test(False, "pixel regions outside the image or partial rows should raise GraphicsError")
+        except graphics.GraphicsError:
+            pass
+
+    np = graphics._numpy()
+    if np is None:
+        return
+    pixels = img.getPixelArray()
+    test(pixels.shape == (3, 4, 3) and bytes(pixels) == bytes(img.getPixels()), "getPixelArray should match getPixels")
+    img.setPixels(np.full((2, 2, 3), 7, dtype=np.uint8), 2, 0)
+    test(img.getPixel(3, 1) == [7, 7, 7] and img.getPixel(1, 1) == [255, 255, 255], "an array should be written as a region")
+    corner = img.getPixelArray()[1:, :2].copy()
+    img.setPixels(img.getPixelArray()[1:, :2])
+    test((img.getPixelArray(0, 0, 2, 2) == corner).all(), "a slice of getPixelArray should be written like a copy")
+    try:
+        img.setPixels(np.zeros((2, 2, 3)))
+        test(False, "setPixels should reject arrays that are not uint8")
+    except graphics.GraphicsError:
+        pass
+
+def runTournamentTests():
+    import tournament
+    strategies = {"fixed": tournament.fixedAim, "solver": tournament.solverAim, "random": tournament.randomAim}
+    table = tournament.runTournament(strategies, games=2, workers=1)
+    test(table == tournament.runTournament(strategies, games=2, workers=2),
+         "tournament results should not depend on the number of workers")
+    for name, row in table.items():
+        test(row["games"] == 2 * 2 * (len(strategies) - 1), "{} should play every other strategy twice as each side".format(name))
+        test(row["wins"] + row["losses"] + row["draws"] == row["games"], "{} should have a result for every game".format(name))
+    test(sum(row["wins"] for row in table.values()) == sum(row["losses"] for row in table.values()),
+         "every win should be someone's loss")
+
+    game = (tournament.solverAim, tournament.randomAim)
+    test(tournament.playGame(game, 12345) == tournament.playGame(game, 12345), "playGame should be reproducible for a seed")
+    score0, score1, shots = tournament.playGame(game, 12345, points=2, maxShots=50)
+    test(max(score0, score1) == 2 or shots == 50, "a game should end at the points or the shot limit")
+
 def run(src_path=None):
     global pass_tests, fail_tests
 
@@ -135,6 +700,30 @@ def run(src_path=None):
 
     game = gamemodel.Game(10,3)
     runTests(game)
+    runResolveTests(gamemodel.Game(10,3))
+    runAimTests(gamemodel.Game(10,3))
+    runTraceTests(gamemodel)
+    runWindTests(gamemodel)
+    runFlyingTests(gamemodel, False)
+    if gamemodel._numpy() is not None:
+        runFlyingTests(gamemodel, True)
+    if src_path == None:
+        runReplayTests()
+        runTournamentTests()
+        runHitTableTests()
+        runLoopTests()
+        runBackendTests()
+        runFrameTests()
+        runExplosionTests()
+        runPointCloudTests()
+        runPixelTests()
+        runPacerTests()
+        runInputTests()
+        runAsyncInputTests()
+        runProfilerTests()
+        runTransformTests()
+    if gamemodel._numpy() is not None:
+        runBatchTests(gamemodel)
 
     print(str(pass_tests)+" out of "+str(pass_tests+fail_tests)+" passed.")
 
@@ -13,10 +13,11 @@ def textInput(game):
     return newAngle, newVel
 
 """ Fires a projectile for the current player and animates it until it stops
-Returns the fired projectile """
+Returns the fired projectile, its path is in proj.getTrace() """
 def textFire(game, angle, vel):
     player = game.getCurrentPlayer()
     proj = player.fire(angle, vel)
+    proj.startTrace(timeStep=1/50)
     print('ball is moving ... ', end='')
     outputThrottle = 0
     while proj.isMoving():
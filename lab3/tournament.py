@@ -0,0 +1,126 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+import gamemodel
+
+""" Headless tournaments between aiming strategies. Games are resolved without any input or
+drawing and run in parallel worker processes, so bots can be evaluated at scale. """
+
+""" The time step used when resolving shots, the same as in textmain and graphicsmain """
+TIME_STEP = 1/50
+
+
+"""
+    Aiming strategies. A strategy is called as strategy(game, rng) when it is the turn of
+    game.getCurrentPlayer(), and returns the (angle, velocity) to fire with. rng is a
+    random.Random private to the game being played. Strategies must be module-level
+    functions so they can be sent to the worker processes.
+"""
+
+""" Fire in a random direction with a random velocity """
+def randomAim(game, rng):
+    return rng.uniform(20, 70), rng.uniform(20, 60)
+
+""" Always fire with the initial aim of a player """
+def fixedAim(game, rng):
+    return 45, 40
+
+""" Fire with one of the aims found by Player.solveAim, or at random if the wind makes a hit impossible """
+def solverAim(game, rng):
+    aims = game.getCurrentPlayer().solveAim()
+    if aims:
+        return rng.choice(aims)
+    return randomAim(game, rng)
+
+""" The strategies known by name, used when running this module as a script """
+STRATEGIES = {"random": randomAim, "fixed": fixedAim, "solver": solverAim}
+
+
+""" Fire a shot for the current player and resolve it. Returns the projectile after it has stopped.
+Awards points, starts a new round and switches player like textmain.textFinishShot """
+def playShot(game, angle, vel):
+    player = game.getCurrentPlayer()
+    other = game.getOtherPlayer()
+    proj = player.fire(angle, vel)
+    proj.resolve(TIME_STEP)
+
+    if other.projectileDistance(proj) == 0.0:
+        player.increaseScore()
+        game.newRound()
+
+    game.nextPlayer()
+    return proj
+
+"""
+    Play a single game between two strategies until a player has the given number of points
+    or maxShots shots have been fired. Returns the scores of both players and the number of shots.
+    The wind and the strategies get separate random streams, both derived from seed.
+"""
+def playGame(strategies, seed, points=3, maxShots=200):
+    rng = random.Random(seed)
+    game = gamemodel.Game(10, 3, gamemodel.shardSeed(seed, "wind"))
+    players = game.getPlayers()
+
+    shots = 0
+    while shots < maxShots and max(p.getScore() for p in players) < points:
+        angle, vel = strategies[game.getCurrentPlayerNumber()](game, rng)
+        playShot(game, angle, vel)
+        shots += 1
+
+    return players[0].getScore(), players[1].getScore(), shots
+
+def _playMatchup(args):
+    # Worker entry point, runs the games of one matchup in a single task
+    strategies, seeds, points, maxShots = args
+    return [playGame(strategies, seed, points, maxShots) for seed in seeds]
+
+"""
+    Play games between every ordered pair of strategies (each strategy gets to start) across
+    a pool of worker processes. strategies maps names to strategy functions. Every game gets
+    its own seed derived from seed and the matchup, so results do not depend on the number
+    of workers or on which strategies take part.
+    Returns a score table, see formatTable.
+"""
+def runTournament(strategies, games=100, points=3, maxShots=200, seed=0, workers=None):
+    matchups = list(permutations(strategies, 2))
+    tasks = []
+    for first, second in matchups:
+        seeds = [gamemodel.shardSeed(seed, first, second, i) for i in range(games)]
+        tasks.append(((strategies[first], strategies[second]), seeds, points, maxShots))
+
+    table = {name: {"games": 0, "wins": 0, "losses": 0, "draws": 0, "points": 0, "shots": 0}
+             for name in strategies}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for (first, second), results in zip(matchups, executor.map(_playMatchup, tasks)):
+            for score0, score1, shots in results:
+                _addResult(table[first], score0, score1, shots)
+                _addResult(table[second], score1, score0, shots)
+
+    return table
+
+def _addResult(row, own, other, shots):
+    row["games"] += 1
+    row["points"] += own
+    row["shots"] += shots
+    if own > other:
+        row["wins"] += 1
+    elif own < other:
+        row["losses"] += 1
+    else:
+        row["draws"] += 1
+
+""" A printable version of a score table, best strategy first """
+def formatTable(table):
+    lines = ['{0:<12}{1:>8}{2:>8}{3:>8}{4:>8}{5:>8}{6:>12}'.format(
+        "strategy", "games", "wins", "losses", "draws", "points", "shots/game")]
+    for name, row in sorted(table.items(), key=lambda item: -item[1]["wins"]):
+        lines.append('{0:<12}{1:>8}{2:>8}{3:>8}{4:>8}{5:>8}{6:>12.1f}'.format(
+            name, row["games"], row["wins"], row["losses"], row["draws"], row["points"],
+            row["shots"] / max(row["games"], 1)))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(formatTable(runTournament(STRATEGIES)))